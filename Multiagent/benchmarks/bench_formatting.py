@@ -0,0 +1,147 @@
+"""Micro-benchmark for report formatting on large "all categories" reports.
+
+Compares the list-building formatter in my_agent.utils.tools with the previous
+string-concatenation implementation, kept below as a reference.
+
+Run from the Multiagent directory:
+    python benchmarks/bench_formatting.py [--sources 5000] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from my_agent.utils.tools import format_enhanced_report, format_published_date
+
+# -------------------- Reference implementation --------------------
+
+def legacy_format_source_items(sources, standalone=False):
+    formatted_text = ""
+    
+    if not sources:
+        return "No sources available."
+    
+    for idx, source in enumerate(sources, 1):
+        if not isinstance(source, dict):
+            formatted_text += f"{idx}. {source}\n\n"
+            continue
+            
+        title = source.get('text', source.get('title', 'No title'))
+        
+        published = source.get("published", "")
+        if published:
+            try:
+                from datetime import datetime
+                date_obj = datetime.fromisoformat(published.replace("Z", "+00:00"))
+                published = date_obj.strftime("%b %d, %Y")
+            except:
+                pass
+        
+        formatted_text += f"{idx}. **{title}**\n"
+        if published:
+            formatted_text += f"   - Published: {published}\n"
+        formatted_text += f"   - Engagement: {source.get('engagement', 'Unknown')}\n"
+        formatted_text += f"   - Source: {source.get('source', 'Unknown')}\n"
+        formatted_text += f"   - Type: {source.get('type', 'Unknown type')}\n"
+        
+        link = source.get('link', source.get('url', '#'))
+        source_name = source.get('source', 'Link')
+        formatted_text += f"   - Link: [{source_name}]({link})\n\n"
+    
+    return formatted_text
+
+def legacy_format_enhanced_report(all_results, report_title, category_suffix):
+    formatted_response = f"# {report_title}\n\n"
+    
+    for category, keyword_data in all_results.items():
+        formatted_response += f"## {category.upper()} - {category_suffix}\n\n"
+        
+        if not isinstance(keyword_data, dict):
+            formatted_response += f"{keyword_data}\n\n"
+            continue
+        
+        for keyword, data in keyword_data.items():
+            stats = data.get("stats", {})
+            summary = data.get("summary", "No summary available")
+            sources = data.get("sources", [])
+            formatted_response += f"### {keyword}\n\n"
+            
+            if stats:
+                formatted_response += "**Statistics:**\n"
+                formatted_response += f"- Mentions: {stats.get('count', 'N/A')}\n"
+                if 'change_in_count' in stats:
+                    change = stats.get('change_in_count')
+                    direction = "↑" if change > 0 else "↓" if change < 0 else "→"
+                    formatted_response += f"- Trend: {direction} {abs(change)}%\n"
+                formatted_response += f"- Engagement: {stats.get('engagement', 'N/A')}\n"
+                formatted_response += f"- Sentiment: {stats.get('sentiment', 'N/A')}\n\n"
+            
+            if summary and summary != "No summary available":
+                formatted_response += "**Summary:**\n"
+                formatted_response += f"{summary}\n\n"
+            
+            formatted_response += "**Top Sources:**\n\n"
+            if isinstance(sources, list):
+                formatted_response += legacy_format_source_items(sources)
+            else:
+                formatted_response += f"Sources: {sources}\n\n"
+    
+    return formatted_response
+
+# -------------------- Benchmark --------------------
+
+def build_results(total_sources, categories=11, keywords_per_category=10):
+    """Synthetic all-categories report with roughly total_sources sources."""
+    sources_per_keyword = max(1, total_sources // (categories * keywords_per_category))
+    all_results = {}
+    for c in range(categories):
+        keyword_results = {}
+        for k in range(keywords_per_category):
+            keyword_results[f"keyword-{c}-{k}"] = {
+                "stats": {"count": k * 10, "change_in_count": k - 5, "engagement": k * 100, "sentiment": "positive"},
+                "summary": "A short AI summary of what people are saying about this keyword. " * 3,
+                "sources": [
+                    {
+                        "text": f"Discussion thread {s} about keyword {k}",
+                        "published": f"2025-03-{1 + s % 28:02d}T12:00:00Z",
+                        "engagement": s * 3,
+                        "source": "reddit" if s % 2 else "hackernews",
+                        "type": "post",
+                        "url": f"https://example.com/{c}/{k}/{s}",
+                    }
+                    for s in range(sources_per_keyword)
+                ],
+            }
+        all_results[f"category{c}"] = keyword_results
+    return all_results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sources", type=int, default=5000, help="approximate number of sources in the report")
+    parser.add_argument("--repeat", type=int, default=5, help="timing repetitions (best is reported)")
+    args = parser.parse_args()
+
+    all_results = build_results(args.sources)
+    legacy = legacy_format_enhanced_report(all_results, "Trending Keywords Analysis", "TRENDS")
+    current = format_enhanced_report(all_results, "Trending Keywords Analysis", "TRENDS")
+    assert legacy == current, "formatter output differs from the reference implementation"
+
+    def run_current():
+        format_published_date.cache_clear()
+        format_enhanced_report(all_results, "Trending Keywords Analysis", "TRENDS")
+
+    legacy_time = min(timeit.repeat(
+        lambda: legacy_format_enhanced_report(all_results, "Trending Keywords Analysis", "TRENDS"),
+        number=1, repeat=args.repeat
+    ))
+    current_time = min(timeit.repeat(run_current, number=1, repeat=args.repeat))
+
+    print(f"report size: {len(current):,} chars, ~{args.sources:,} sources")
+    print(f"legacy  (+= concatenation): {legacy_time * 1000:8.2f} ms")
+    print(f"current (list builder):     {current_time * 1000:8.2f} ms")
+    print(f"speedup: {legacy_time / current_time:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Benchmark of per-hop supervisor overhead with a fake chat model.
+
+Supervisors used to call llm.with_structured_output(Router) on every hop, re-deriving the
+tool schema and rebuilding the runnable each time; the factories now build the router once.
+The fake model answers instantly, so the timings are pure framework overhead.
+
+Run from the Multiagent directory:
+    python benchmarks/bench_router.py [--hops 500] [--history 20] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import timeit
+from typing import Any, List, Literal, TypedDict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The fake model is passed explicitly; the default clients are never built or called
+for key in ("OPENAI_API_KEY", "GOOGLE_API_KEY", "ANTHROPIC_API_KEY"):
+    os.environ.setdefault(key, "benchmark")
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from my_agent.utils.nodes import make_team_supervisor_node, prepare_supervisor_context
+
+MEMBERS = ["trending_keywords_agent", "top_keywords_agent", "keyword_search_agent", "trending_github_repos_agent"]
+
+class FakeToolCallingModel(BaseChatModel):
+    """Chat model that always calls the first bound tool with a fixed routing decision."""
+
+    tools: List[Any] = []
+
+    @property
+    def _llm_type(self):
+        return "fake-tool-calling"
+
+    def bind_tools(self, tools, **kwargs):
+        return self.model_copy(update={"tools": [convert_to_openai_tool(tool) for tool in tools]})
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        name = self.tools[0]["function"]["name"]
+        args = {"next": MEMBERS[0], "instruction": "Fetch the trending AI keywords for this week."}
+        message = AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": "call"}])
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+def build_state(history):
+    messages = [HumanMessage(content="What happened in tech this week?")]
+    for i in range(1, history):
+        messages.append(HumanMessage(content=f"[INSTRUCTION FROM RESEARCH TEAM SUPERVISOR]\nstep {i}", name="supervisor"))
+    return {"messages": messages}
+
+def make_legacy_node(model, system_prompt):
+    """The previous supervisor: the structured-output router is rebuilt on every call."""
+    options = ["FINISH"] + MEMBERS
+
+    class Router(TypedDict):
+        next: Literal[*options]
+        instruction: str
+
+    def node(state):
+        messages, _ = prepare_supervisor_context(system_prompt, state)
+        return model.with_structured_output(Router).invoke(messages)
+
+    return node
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hops", type=int, default=500, help="supervisor hops per timing run")
+    parser.add_argument("--history", type=int, default=20, help="messages in the state")
+    parser.add_argument("--repeat", type=int, default=5, help="timing repetitions (best is reported)")
+    args = parser.parse_args()
+
+    model = FakeToolCallingModel()
+    system_prompt = "You are a supervisor coordinating the research team."
+    state = build_state(args.history)
+
+    legacy = make_legacy_node(model, system_prompt)
+    current = make_team_supervisor_node(MEMBERS, "supervisor", system_prompt, "RESEARCH", model=model)
+    assert current(state).goto == legacy(state)["next"], "routers disagree"
+
+    legacy_time = min(timeit.repeat(lambda: legacy(state), number=args.hops, repeat=args.repeat)) / args.hops
+    current_time = min(timeit.repeat(lambda: current(state), number=args.hops, repeat=args.repeat)) / args.hops
+
+    print(f"{args.hops} hops, {args.history} messages in state (per hop)")
+    print(f"legacy  (router rebuilt per hop): {legacy_time * 1000:8.3f} ms")
+    print(f"current (router built once):      {current_time * 1000:8.3f} ms")
+    print(f"speedup: {legacy_time / current_time:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark of graph import time with lazy versus preloaded models and agents.
+
+Models, compiled ReAct agents and structured-output routers are built on first use, so
+importing my_agent.agent no longer imports the provider SDKs or constructs a dozen agents.
+Each measurement runs in a fresh interpreter: a plain import and an import with
+MODELS_PRELOAD=1 (the previous eager behaviour), each also broken down per package with
+python -X importtime.
+
+Run from the Multiagent directory:
+    python benchmarks/bench_startup.py [--repeat 5] [--top 15]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TIMED_IMPORT = (
+    "import time; start = time.perf_counter(); import my_agent.agent; "
+    "print(time.perf_counter() - start)"
+)
+PROVIDER_PACKAGES = ("langchain_openai", "langchain_google_genai", "openai", "google")
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+\d+\s+\|\s*(\S+)")
+
+def environment(preload):
+    env = dict(os.environ, PYTHONPATH=ROOT, MODELS_PRELOAD="1" if preload else "0")
+    # Preloading constructs the clients, which only check that a key is present
+    for key in ("OPENAI_API_KEY", "GOOGLE_API_KEY", "ANTHROPIC_API_KEY"):
+        env.setdefault(key, "benchmark")
+    return env
+
+def timed_import(preload):
+    result = subprocess.run([sys.executable, "-c", TIMED_IMPORT], env=environment(preload),
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+def import_breakdown(preload):
+    """Seconds spent importing each top-level package (self time, from python -X importtime)."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import my_agent.agent"],
+                            env=environment(preload), cwd=ROOT, capture_output=True, text=True, check=True)
+    packages = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            package = match.group(2).split(".")[0]
+            packages[package] = packages.get(package, 0) + int(match.group(1)) / 1e6
+    return packages
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per mode (best is reported)")
+    parser.add_argument("--top", type=int, default=15, help="slowest packages to list")
+    args = parser.parse_args()
+
+    lazy_time = min(timed_import(False) for _ in range(args.repeat))
+    eager_time = min(timed_import(True) for _ in range(args.repeat))
+
+    print(f"import my_agent.agent (best of {args.repeat} fresh interpreters)")
+    print(f"preloaded (MODELS_PRELOAD=1): {eager_time * 1000:8.1f} ms")
+    print(f"lazy:                         {lazy_time * 1000:8.1f} ms")
+    print(f"speedup: {eager_time / lazy_time:.2f}x")
+
+    for label, preload in (("lazy", False), ("preloaded", True)):
+        packages = import_breakdown(preload)
+        providers = [name for name in packages if name in PROVIDER_PACKAGES]
+        print(f"\n-X importtime, {label}: {sum(packages.values()) * 1000:.1f} ms in {len(packages)} packages, "
+              f"provider SDKs imported: {', '.join(providers) or 'none'}")
+        for name, seconds in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+            print(f"  {seconds * 1000:8.1f} ms  {name}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Regression benchmark for per-step state update overhead as the message history grows.
+
+Nodes return only their new message and let the add_messages reducer append it. The
+previous pattern, state["messages"] + [message], copied the whole history on every step
+and made the reducer re-merge it by ID, so the cost of a step grew with the history.
+Both patterns are timed on the bare reducer and on a small looping LangGraph graph.
+
+Run from the Multiagent directory:
+    python benchmarks/bench_state_updates.py [--sizes 100 1000 5000] [--steps 20] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import StateGraph, START, END
+from langgraph.graph.message import add_messages
+from langgraph.types import Command
+
+from my_agent.utils.state import MultiAgentState
+
+def build_history(size):
+    """A history of alternating supervisor instructions and agent results, with IDs assigned."""
+    messages = [HumanMessage(content="What happened in tech this week?")]
+    for i in range(1, size):
+        if i % 2:
+            messages.append(HumanMessage(content=f"[INSTRUCTION FROM MAIN SUPERVISOR]\nstep {i}", name="supervisor"))
+        else:
+            messages.append(AIMessage(content=f"[COMPLETED agent]\nresult {i}", name="agent"))
+    return add_messages([], messages)
+
+# -------------------- Reducer --------------------
+
+def time_reducer(history, delta_only, repeat):
+    def step():
+        message = AIMessage(content="[COMPLETED agent]\nnew result", name="agent")
+        add_messages(history, [message] if delta_only else history + [message])
+    return min(timeit.repeat(step, number=10, repeat=repeat)) / 10
+
+# -------------------- Graph --------------------
+
+def build_loop_graph(delta_only, steps):
+    """A one-node graph that loops `steps` times, appending one message per step like our agent nodes."""
+    def node(state: MultiAgentState) -> Command:
+        message = AIMessage(content="[COMPLETED agent]\nnew result", name="agent")
+        done = state["next"] == str(steps - 1)
+        return Command(
+            update={
+                "next": str(int(state["next"] or "0") + 1),
+                "messages": [message] if delta_only else state["messages"] + [message],
+            },
+            goto=END if done else "agent",
+        )
+
+    workflow = StateGraph(MultiAgentState)
+    workflow.add_node("agent", node)
+    workflow.add_edge(START, "agent")
+    return workflow.compile()
+
+def time_graph(history, delta_only, steps, repeat):
+    graph = build_loop_graph(delta_only, steps)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = graph.invoke({"messages": history, "next": "0"}, {"recursion_limit": steps + 10})
+        best = min(best, time.perf_counter() - start)
+    assert len(result["messages"]) == len(history) + steps, "graph appended the wrong number of messages"
+    return best / steps
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 2500, 5000], help="history sizes to measure")
+    parser.add_argument("--steps", type=int, default=20, help="graph steps per run")
+    parser.add_argument("--repeat", type=int, default=3, help="timing repetitions (best is reported)")
+    args = parser.parse_args()
+
+    print(f"{'messages':>8} | {'reducer full':>12} {'reducer delta':>13} | {'graph full':>10} {'graph delta':>11}  (ms per step)")
+    for size in args.sizes:
+        history = build_history(size)
+        reducer_full = time_reducer(history, delta_only=False, repeat=args.repeat)
+        reducer_delta = time_reducer(history, delta_only=True, repeat=args.repeat)
+        graph_full = time_graph(history, delta_only=False, steps=args.steps, repeat=args.repeat)
+        graph_delta = time_graph(history, delta_only=True, steps=args.steps, repeat=args.repeat)
+        print(
+            f"{size:>8} | {reducer_full * 1000:>12.3f} {reducer_delta * 1000:>13.3f} | "
+            f"{graph_full * 1000:>10.3f} {graph_delta * 1000:>11.3f}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,44 @@
 from langgraph.graph import StateGraph, START, END
 from my_agent.utils.nodes import (
-    supervisor_node, 
+    supervisor_node,
     research_supervisor_node, trending_keywords_node, top_keywords_node, search_keywords_node, github_keywords_node,
-    editing_supervisor_node, fact_checker_node, summarizer_node
+    editing_supervisor_node, fact_checker_node, summarizer_node,
+    asupervisor_node,
+    aresearch_supervisor_node, atrending_keywords_node, atop_keywords_node, asearch_keywords_node, agithub_keywords_node,
+    aediting_supervisor_node, afact_checker_node, asummarizer_node,
+    with_run_notes
 )
+from my_agent.utils.models import preload, preload_enabled
 from my_agent.utils.state import MultiAgentState
 
-# Create the main graph
-workflow = StateGraph(MultiAgentState)
+def build_graph(asynchronous=False):
+    """Build the multi-agent graph from the sync nodes, or from the async nodes for event-loop servers."""
+    workflow = StateGraph(MultiAgentState)
 
-# Add all nodes 
-workflow.add_node("supervisor", supervisor_node)
+    # Add all nodes, each scoped to its run's notes document
+    workflow.add_node("supervisor", with_run_notes(asupervisor_node if asynchronous else supervisor_node))
 
-# Research team nodes
-workflow.add_node("research_supervisor", research_supervisor_node)
-workflow.add_node("trending_keywords_agent", trending_keywords_node)
-workflow.add_node("top_keywords_agent", top_keywords_node)  
-workflow.add_node("keyword_search_agent", search_keywords_node)
-workflow.add_node("trending_github_repos_agent", github_keywords_node)
+    # Research team nodes
+    workflow.add_node("research_supervisor", with_run_notes(aresearch_supervisor_node if asynchronous else research_supervisor_node))
+    workflow.add_node("trending_keywords_agent", with_run_notes(atrending_keywords_node if asynchronous else trending_keywords_node))
+    workflow.add_node("top_keywords_agent", with_run_notes(atop_keywords_node if asynchronous else top_keywords_node))
+    workflow.add_node("keyword_search_agent", with_run_notes(asearch_keywords_node if asynchronous else search_keywords_node))
+    workflow.add_node("trending_github_repos_agent", with_run_notes(agithub_keywords_node if asynchronous else github_keywords_node))
 
-# Editing team nodes
-workflow.add_node("editing_supervisor", editing_supervisor_node)
-workflow.add_node("fact_checker", fact_checker_node)
-workflow.add_node("summarizer", summarizer_node)
+    # Editing team nodes
+    workflow.add_node("editing_supervisor", with_run_notes(aediting_supervisor_node if asynchronous else editing_supervisor_node))
+    workflow.add_node("fact_checker", with_run_notes(afact_checker_node if asynchronous else fact_checker_node))
+    workflow.add_node("summarizer", with_run_notes(asummarizer_node if asynchronous else summarizer_node))
 
-# Only need the starting edge
-workflow.add_edge(START, "supervisor")
+    # Only need the starting edge
+    workflow.add_edge(START, "supervisor")
 
-# Compile the graph
-graph = workflow.compile()
+    # Compile the graph
+    return workflow.compile()
+
+graph = build_graph()
+async_graph = build_graph(asynchronous=True)
+
+# Models and agents are otherwise built by the first request that uses them
+if preload_enabled():
+    preload()
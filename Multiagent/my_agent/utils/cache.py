@@ -0,0 +1,218 @@
+import functools
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# -------------------- Configuration --------------------
+
+CACHE_BACKEND = os.environ.get("SAFRON_CACHE_BACKEND", "memory")  # memory, sqlite or none
+CACHE_PATH = os.environ.get("SAFRON_CACHE_PATH", os.path.join("cache", "safron_cache.sqlite"))
+CACHE_MAX_SIZE = int(os.environ.get("SAFRON_CACHE_MAX_SIZE", "2048"))
+
+# Seconds a successful response stays fresh, per endpoint and period.
+# Daily data moves quickly; longer periods are recomputed upstream far less often.
+ENDPOINT_TTLS = {
+    "keywords": {"daily": 15 * 60, "weekly": 3 * 3600, "monthly": 12 * 3600, "quarterly": 24 * 3600},
+    "sources": {"daily": 15 * 60, "weekly": 3 * 3600, "monthly": 12 * 3600, "quarterly": 24 * 3600},
+    "ai-summary": {"daily": 30 * 60, "weekly": 6 * 3600, "monthly": 24 * 3600, "quarterly": 48 * 3600},
+    "ai-summary-batch": {"daily": 30 * 60, "weekly": 6 * 3600, "monthly": 24 * 3600, "quarterly": 48 * 3600},
+}
+DEFAULT_TTL = 15 * 60
+
+_MISSING = object()
+
+# -------------------- Backends --------------------
+
+class MemoryCache:
+    """In-process LRU cache with per-entry expiry."""
+
+    def __init__(self, max_size=CACHE_MAX_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SqliteCache:
+    """On-disk LRU cache shared between processes on the same machine."""
+
+    def __init__(self, path=CACHE_PATH, max_size=CACHE_MAX_SIZE):
+        self.path = path
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return _MISSING
+            if row[1] <= now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return _MISSING
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now + ttl, now)
+            )
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_size,)
+            )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+# -------------------- Response cache --------------------
+
+class ResponseCache:
+    """Caches successful (True, data) API responses and counts hits and misses per endpoint."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _record(self, endpoint, outcome):
+        with self._lock:
+            counters = self._stats.setdefault(endpoint, {"hits": 0, "misses": 0})
+            counters[outcome] += 1
+
+    def get(self, endpoint, key):
+        value = self.backend.get(key) if self.backend is not None else _MISSING
+        self._record(endpoint, "misses" if value is _MISSING else "hits")
+        return value
+
+    def set(self, endpoint, key, value, period):
+        if self.backend is not None:
+            ttl = ENDPOINT_TTLS.get(endpoint, {}).get(period, DEFAULT_TTL)
+            self.backend.set(key, value, ttl)
+
+    def stats(self):
+        with self._lock:
+            return {endpoint: dict(counters) for endpoint, counters in self._stats.items()}
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear()
+        with self._lock:
+            self._stats.clear()
+
+
+def create_backend(backend=CACHE_BACKEND, path=CACHE_PATH, max_size=CACHE_MAX_SIZE):
+    if backend == "memory":
+        return MemoryCache(max_size=max_size)
+    if backend == "sqlite":
+        return SqliteCache(path=path, max_size=max_size)
+    if backend in ("none", "", None):
+        return None
+    raise ValueError(f"Unknown cache backend '{backend}'. Please use one of: memory, sqlite, none")
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache():
+    """Return the shared response cache, creating it on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(create_backend(CACHE_BACKEND, CACHE_PATH, CACHE_MAX_SIZE))
+    return _cache
+
+def configure_cache(backend="memory", path=CACHE_PATH, max_size=CACHE_MAX_SIZE):
+    """Replace the shared response cache with a new backend."""
+    global _cache
+    with _cache_lock:
+        _cache = ResponseCache(create_backend(backend, path, max_size))
+    return _cache
+
+def cache_stats():
+    """Hit/miss counters per endpoint for the shared response cache."""
+    return get_cache().stats()
+
+def clear_cache():
+    get_cache().clear()
+
+# -------------------- Decorators --------------------
+
+def call_arguments(func, args, kwargs):
+    """Bind a call's arguments to the function signature, filling in defaults."""
+    bound = inspect.signature(func).bind(*args, **kwargs)
+    bound.apply_defaults()
+    return bound.arguments
+
+def request_key(endpoint, arguments):
+    """Build a stable key from an endpoint name and bound call arguments."""
+    return f"{endpoint}:{json.dumps(arguments, sort_keys=True, default=str)}"
+
+def cached_response(endpoint):
+    """Serve a fetch function's successful responses from the shared response cache."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            arguments = call_arguments(func, args, kwargs)
+            key = request_key(endpoint, arguments)
+            cache = get_cache()
+            cached = cache.get(endpoint, key)
+            if cached is not _MISSING:
+                return True, cached
+
+            success, data = func(*args, **kwargs)
+            if success:
+                cache.set(endpoint, key, data, arguments.get("period"))
+            return success, data
+        return wrapper
+    return decorator
@@ -0,0 +1,132 @@
+import os
+from langchain_core.messages import SystemMessage
+
+# -------------------- Configuration --------------------
+# Supervisors only need the user's request, the recent turns and an outline of what
+# already happened to pick the next worker, so older turns are folded into a summary.
+
+# Most recent messages sent verbatim; 0 disables the window and sends the full history
+CONTEXT_RECENT_TURNS = int(os.environ.get("SUPERVISOR_CONTEXT_TURNS", "6"))
+# Approximate token budget for everything sent to a supervisor; 0 disables it
+CONTEXT_MAX_TOKENS = int(os.environ.get("SUPERVISOR_CONTEXT_TOKENS", "12000"))
+# Length of each older message's line in the running summary
+SUMMARY_LINE_CHARS = int(os.environ.get("SUPERVISOR_SUMMARY_LINE_CHARS", "160"))
+
+# Rough characters-per-token ratio used for the budget
+CHARS_PER_TOKEN = 4
+
+def configure_context(recent_turns=None, max_tokens=None, summary_line_chars=None):
+    """Change the supervisor context window at runtime."""
+    global CONTEXT_RECENT_TURNS, CONTEXT_MAX_TOKENS, SUMMARY_LINE_CHARS
+    if recent_turns is not None:
+        CONTEXT_RECENT_TURNS = recent_turns
+    if max_tokens is not None:
+        CONTEXT_MAX_TOKENS = max_tokens
+    if summary_line_chars is not None:
+        SUMMARY_LINE_CHARS = summary_line_chars
+
+# -------------------- Running summary --------------------
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def summarize_message(message):
+    """One line outlining a message: who sent it and how it starts."""
+    author = message.name or message.type
+    text = " ".join(str(message.content).split())
+    if len(text) > SUMMARY_LINE_CHARS:
+        text = text[:SUMMARY_LINE_CHARS - 3].rstrip() + "..."
+    return f"- {author}: {text}"
+
+def update_summary(summary, older, run=None):
+    """Extend a cached running summary so it covers every message in older.
+
+    summary is {"run": ..., "count": messages covered, "lines": [...]} from the state, or
+    None. Only messages past the cached count are summarized; a cache from another run or
+    covering more messages than older (e.g. after the window was widened) is rebuilt.
+    """
+    if not summary or summary.get("run") != run or summary["count"] > len(older):
+        summary = {"run": run, "count": 0, "lines": []}
+    if summary["count"] == len(older):
+        return summary
+    new_lines = [summarize_message(message) for message in older[summary["count"]:]]
+    return {"run": run, "count": len(older), "lines": summary["lines"] + new_lines}
+
+# -------------------- Context window --------------------
+
+def build_system_message(system_prompt, summary_lines):
+    if not summary_lines:
+        return SystemMessage(content=system_prompt)
+    outline = "\n".join(summary_lines)
+    return SystemMessage(content=f"{system_prompt}\n\nEarlier in this run (oldest first):\n{outline}")
+
+def truncate_message(message, max_chars):
+    content = str(message.content)
+    if len(content) <= max_chars:
+        return message
+    return message.model_copy(update={"content": f"{content[:max_chars]}\n[... truncated]"})
+
+def run_history(history, request_id=None):
+    """The messages of the current run: history from the run's user message (request_id) on.
+
+    A thread can hold several runs; the earlier ones are left out of the window. Without
+    request_id (or if it is not in history) the whole history is the run.
+    """
+    if request_id is None:
+        return history
+    index = next((i for i, message in enumerate(history) if message.id == request_id), 0)
+    return history[index:]
+
+def build_context_window(system_prompt, history, summary=None, request_id=None):
+    """Select what a supervisor sees from its normalized history.
+
+    Keeps the system prompt, the current run's user request (request_id, see run_history)
+    and its last CONTEXT_RECENT_TURNS messages verbatim; older messages of the run are
+    folded into a running summary appended to the system prompt. If the result is still
+    over CONTEXT_MAX_TOKENS, the oldest recent messages move into the summary, then the
+    summary keeps only its latest lines, and finally long recent messages are truncated.
+
+    Returns the messages to send and the updated summary to store in the state.
+    """
+    if CONTEXT_RECENT_TURNS <= 0:
+        return [SystemMessage(content=system_prompt), *history], summary
+
+    history = run_history(history, request_id)
+    if len(history) <= CONTEXT_RECENT_TURNS + 1:
+        return [SystemMessage(content=system_prompt), *history], summary
+
+    request, older, recent = history[0], history[1:-CONTEXT_RECENT_TURNS], history[-CONTEXT_RECENT_TURNS:]
+    summary = update_summary(summary, older, request.id)
+    summary_lines = summary["lines"]
+
+    if CONTEXT_MAX_TOKENS > 0:
+        budget = CONTEXT_MAX_TOKENS - estimate_tokens(system_prompt) - estimate_tokens(str(request.content))
+        recent_tokens = [estimate_tokens(str(message.content)) for message in recent]
+        summary_tokens = sum(estimate_tokens(line) for line in summary_lines)
+
+        # Fold the oldest recent messages into the summary, keeping at least the latest one
+        extra_lines = []
+        while len(recent) > 1 and summary_tokens + sum(recent_tokens) > budget:
+            line = summarize_message(recent[0])
+            extra_lines.append(line)
+            summary_tokens += estimate_tokens(line)
+            recent, recent_tokens = recent[1:], recent_tokens[1:]
+        summary_lines = summary_lines + extra_lines
+
+        # Keep only the newest summary lines that fit next to the recent messages
+        kept_lines = []
+        available = budget - sum(recent_tokens)
+        for line in reversed(summary_lines):
+            available -= estimate_tokens(line)
+            if available < 0:
+                break
+            kept_lines.append(line)
+        summary_lines = kept_lines[::-1]
+
+        # Share what is left between the recent messages
+        available = budget - sum(estimate_tokens(line) for line in summary_lines)
+        if sum(recent_tokens) > available:
+            max_chars = max(0, available // len(recent)) * CHARS_PER_TOKEN
+            recent = [truncate_message(message, max_chars) for message in recent]
+
+    return [build_system_message(system_prompt, summary_lines), request, *recent], summary
@@ -0,0 +1,162 @@
+import asyncio
+import os
+import re
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langgraph.types import Command
+from my_agent.utils.tools import write_notes, stream_notes, astream_notes
+
+# -------------------- Configuration --------------------
+# The research agents always make the same moves: pick tool arguments, call their one tool,
+# re-emit the whole report through write_notes and say they are done. In "direct" mode
+# their nodes do this without the ReAct loop: the supervisor's instruction is parsed into
+# tool arguments, the tool runs, and its report goes to the notes as is (chunk by chunk
+# for the keyword reports, which are produced section by section).
+
+EXECUTION_MODE = os.environ.get("RESEARCH_EXECUTION", "agent")  # agent or direct
+
+PERIODS = ["daily", "weekly", "monthly", "quarterly"]
+CATEGORIES = ["companies", "ai", "tools", "platforms", "hardware", "people",
+              "frameworks", "languages", "concepts", "websites", "subjects"]
+SOURCES = ["reddit", "hackernews", "github", "medium"]
+MAX_CATEGORIES = 4
+
+DONE_MESSAGE = "I'm done, I have saved all the research in the document"
+
+def direct_enabled():
+    return EXECUTION_MODE == "direct"
+
+def direct_tool(tool, atool, section, fixed=None, defaults=None, required=(), stream=None, astream=None):
+    """How a research agent runs its tool directly.
+
+    fixed arguments always override parsed ones (e.g. source="github"), defaults fill in
+    arguments the instruction does not mention, and required names the arguments the
+    parser must find for its result to be used without a structured model call. stream
+    and astream, when given, produce the tool's report in chunks from the same arguments;
+    each chunk is appended to the notes as soon as it is ready.
+    """
+    return {"tool": tool, "atool": atool, "section": section, "fixed": fixed or {},
+            "defaults": defaults or {}, "required": tuple(required),
+            "stream": stream, "astream": astream}
+
+# -------------------- Instruction parsing --------------------
+
+# Only double or typographic double quotes: apostrophes ("I'm", "user's") are not quotes
+QUOTED = re.compile(r"[\"“]([^\"“”\n]{1,60})[\"”]")
+# Argument names an instruction may spell out as "name: value" or "name=[a, b]"
+ARGUMENT_NAMES = {
+    "categories": ("categories", "category"),
+    "period": ("period",),
+    "source": ("source",),
+    "keywords": ("keywords", "keyword"),
+}
+
+def explicit_values(instruction, field):
+    """Values given for field in "name: a, b" or "name: [a, b]" form, or None if it is not named."""
+    names = "|".join(ARGUMENT_NAMES[field])
+    match = re.search(
+        rf"\b(?:{names})\s*[:=]\s*(\[[^\]\n]*\]|(?:(?!\b\w+\s*[:=])[^\n.;])+)",
+        instruction, re.IGNORECASE
+    )
+    if not match:
+        return None
+    values = [value.strip(" \t\"'“”‘’") for value in match.group(1).strip("[] ").split(",")]
+    return [value for value in values if value]
+
+def parse_tool_args(instruction, fields):
+    """Pull tool arguments out of an instruction with plain pattern matching.
+
+    Only arguments the tool accepts (fields) and that the text spells out are returned:
+    "name: value" or "name: [a, b]" forms with known categories, a single known period or
+    source, and keywords given that way or in double quotes. Prose is never guessed at.
+    """
+    args = {}
+    if "categories" in fields:
+        categories = [c.lower() for c in explicit_values(instruction, "categories") or [] if c.lower() in CATEGORIES]
+        if categories:
+            args["categories"] = list(dict.fromkeys(categories))[:MAX_CATEGORIES]
+    for field, known in (("period", PERIODS), ("source", SOURCES)):
+        if field in fields:
+            # "period: monthly and source: github" names monthly: one word per value
+            values = [v.split()[0].lower() for v in explicit_values(instruction, field) or []]
+            if len(values) == 1 and values[0] in known:
+                args[field] = values[0]
+    if "keywords" in fields:
+        keywords = explicit_values(instruction, "keywords")
+        if keywords is None:
+            keywords = [k.strip() for k in QUOTED.findall(instruction)]
+        keywords = [k for k in keywords if k]
+        if keywords:
+            args["keywords"] = ", ".join(keywords)
+    return args
+
+def tool_arguments(spec, request, instruction, extractor=None):
+    """Tool arguments for an instruction: the parser's, or one structured call if it falls short.
+
+    When the structured call is made its values win; parsed ones only fill in what it left out.
+    """
+    fields = spec["tool"].args
+    args = parse_tool_args(instruction, fields)
+    if extractor is not None and not all(name in args for name in spec["required"]):
+        extracted = extractor.invoke(extraction_messages(spec, request, instruction))
+        args = {**args, **as_dict(extracted)}
+    return finalize_arguments(spec, args)
+
+async def atool_arguments(spec, request, instruction, extractor=None):
+    fields = spec["tool"].args
+    args = parse_tool_args(instruction, fields)
+    if extractor is not None and not all(name in args for name in spec["required"]):
+        extracted = await extractor.ainvoke(extraction_messages(spec, request, instruction))
+        args = {**args, **as_dict(extracted)}
+    return finalize_arguments(spec, args)
+
+def as_dict(extracted):
+    """The extractor's values, without the fields it left empty."""
+    if extracted is None:
+        return {}
+    values = extracted.model_dump() if hasattr(extracted, "model_dump") else dict(extracted)
+    return {name: value for name, value in values.items() if value not in (None, "", [])}
+
+def extraction_messages(spec, request, instruction):
+    tool = spec["tool"]
+    return [
+        SystemMessage(content=f"Choose the arguments for the {tool.name} tool from the request and the instruction.\n\n{tool.description}"),
+        HumanMessage(content=f"User request:\n{request}\n\nInstruction:\n{instruction}"),
+    ]
+
+def finalize_arguments(spec, args):
+    fields = spec["tool"].args
+    args = {name: value for name, value in args.items() if name in fields and value not in (None, "", [])}
+    return {**spec["defaults"], **args, **spec["fixed"]}
+
+# -------------------- Nodes --------------------
+
+def completed_command(agent_name, message_name, goto, args, notes_result):
+    summary = ", ".join(f"{name}={value}" for name, value in args.items())
+    return Command(
+        update={
+            "messages": [
+                AIMessage(content=f"[COMPLETED {agent_name}]\n{DONE_MESSAGE} ({notes_result} Arguments: {summary})", name=message_name)
+            ]
+        },
+        goto=goto,
+    )
+
+def run_direct_node(spec, request, instruction, agent_name, message_name, goto, extractor=None):
+    """Run a research agent's tool directly and save its report to the notes."""
+    args = tool_arguments(spec, request, instruction, extractor)
+    if spec["stream"] is not None:
+        notes_result = stream_notes(spec["stream"](**args), section=spec["section"])
+    else:
+        report = spec["tool"].invoke(args)
+        notes_result = write_notes.func(content=report, section=spec["section"])
+    return completed_command(agent_name, message_name, goto, args, notes_result)
+
+async def arun_direct_node(spec, request, instruction, agent_name, message_name, goto, extractor=None):
+    """Async run_direct_node: the tool's async variant runs on the event loop."""
+    args = await atool_arguments(spec, request, instruction, extractor)
+    if spec["astream"] is not None:
+        notes_result = await astream_notes(spec["astream"](**args), section=spec["section"])
+    else:
+        report = await spec["atool"].ainvoke(args)
+        notes_result = await asyncio.to_thread(write_notes.func, content=report, section=spec["section"])
+    return completed_command(agent_name, message_name, goto, args, notes_result)
@@ -0,0 +1,55 @@
+import threading
+from concurrent.futures import Future
+
+# -------------------- Future chaining --------------------
+# Follow-up requests are submitted from done-callbacks rather than by a thread waiting on
+# a result, so no pool worker (or consumer) blocks while the first request is in flight.
+
+def copy_outcome(source, target):
+    """Complete target with source's result or exception."""
+    try:
+        target.set_result(source.result())
+    except Exception as e:
+        target.set_exception(e)
+
+def then(future, callback):
+    """Future of callback(future's result); if callback returns a Future, of that Future's result."""
+    result = Future()
+
+    def resolve(source):
+        try:
+            value = callback(source.result())
+        except Exception as e:
+            result.set_exception(e)
+            return
+        if isinstance(value, Future):
+            value.add_done_callback(lambda inner: copy_outcome(inner, result))
+        else:
+            result.set_result(value)
+
+    future.add_done_callback(resolve)
+    return result
+
+def gather(futures):
+    """Future of the results of futures, in order; fails with the first failure once all are done."""
+    futures = list(futures)
+    result = Future()
+    if not futures:
+        result.set_result([])
+        return result
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def done(_):
+        with lock:
+            remaining[0] -= 1
+            if remaining[0]:
+                return
+        try:
+            result.set_result([future.result() for future in futures])
+        except Exception as e:
+            result.set_exception(e)
+
+    for future in futures:
+        future.add_done_callback(done)
+    return result
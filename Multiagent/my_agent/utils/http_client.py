@@ -0,0 +1,98 @@
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from my_agent.utils.ratelimit import acquire
+from my_agent.utils.resilience import call_with_resilience
+
+# -------------------- Configuration --------------------
+
+SAFRON_BASE_URL = os.environ.get("SAFRON_BASE_URL", "https://public.api.safron.io/v2")
+POOL_SIZE = int(os.environ.get("SAFRON_POOL_SIZE", "16"))
+CONNECT_TIMEOUT = float(os.environ.get("SAFRON_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.environ.get("SAFRON_READ_TIMEOUT", "60"))
+
+DEFAULT_HEADERS = {
+    "Accept": "application/json",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+}
+
+# -------------------- Session --------------------
+
+_session = None
+_session_lock = threading.Lock()
+
+def create_session(pool_size):
+    """Create a keep-alive session with a connection pool sized for concurrent calls."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+def get_session():
+    """Return the shared session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session(POOL_SIZE)
+    return _session
+
+def configure_client(base_url=None, pool_size=None, connect_timeout=None, read_timeout=None):
+    """Override client settings at runtime. The shared session is rebuilt on next use."""
+    global SAFRON_BASE_URL, POOL_SIZE, CONNECT_TIMEOUT, READ_TIMEOUT, _session
+    with _session_lock:
+        if base_url is not None:
+            SAFRON_BASE_URL = base_url
+        if pool_size is not None:
+            POOL_SIZE = pool_size
+        if connect_timeout is not None:
+            CONNECT_TIMEOUT = connect_timeout
+        if read_timeout is not None:
+            READ_TIMEOUT = read_timeout
+        if _session is not None:
+            _session.close()
+        _session = None
+
+def close_session():
+    """Close the shared session and release pooled connections."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+# -------------------- Requests --------------------
+
+def api_url(path):
+    return f"{SAFRON_BASE_URL.rstrip('/')}/{path.lstrip('/')}"
+
+def api_endpoint(path):
+    return path.strip("/")
+
+def api_request(method, path, **kwargs):
+    """Send a request to a Safron API endpoint through the pooled session.
+
+    Every attempt waits for the endpoint's rate limiter; retries and circuit
+    breaking are handled by call_with_resilience.
+    """
+    endpoint = api_endpoint(path)
+    if not kwargs.get("timeout"):
+        kwargs["timeout"] = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+    def send():
+        acquire(endpoint)
+        return get_session().request(method, api_url(path), **kwargs)
+
+    return call_with_resilience(endpoint, send)
+
+def api_get(path, params=None, timeout=None):
+    """GET a Safron API endpoint."""
+    return api_request("GET", path, params=params, timeout=timeout)
+
+def api_post(path, json=None, params=None, timeout=None):
+    """POST JSON to a Safron API endpoint."""
+    return api_request("POST", path, json=json, params=params, timeout=timeout)
@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+import threading
+import warnings
+from langchain_core._api import LangChainBetaWarning
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk
+from my_agent.utils.cache import _MISSING, create_backend
+
+# -------------------- Configuration --------------------
+# Opt-in cache of chat model responses. A replayed run (same request, same models) gets
+# every supervisor decision and agent turn from the cache without calling a provider.
+# Chat clients built by the model registry use it when LLM_CACHE_BACKEND is set.
+
+LLM_CACHE_BACKEND = os.environ.get("LLM_CACHE_BACKEND", "none")  # none, memory or sqlite
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", os.path.join("cache", "llm_cache.sqlite"))
+LLM_CACHE_MAX_SIZE = int(os.environ.get("LLM_CACHE_MAX_SIZE", "4096"))
+LLM_CACHE_TTL = float(os.environ.get("LLM_CACHE_TTL", str(24 * 3600)))
+
+# What a cached response may deserialize to
+CACHED_OBJECTS = [ChatGeneration, ChatGenerationChunk, AIMessage, AIMessageChunk]
+
+# loads() warns that it is in beta on every call, i.e. on every cache hit
+warnings.filterwarnings("ignore", message="The function `loads` is in beta", category=LangChainBetaWarning)
+
+# -------------------- Keys --------------------
+
+def normalize_prompt(prompt):
+    """The parts of a serialized prompt that decide the response.
+
+    Message IDs, provider metadata and tool call IDs differ between otherwise identical
+    runs, so only each message's type, name, content and tool calls are kept.
+    """
+    try:
+        messages = json.loads(prompt)
+    except ValueError:
+        return prompt
+    if not isinstance(messages, list):
+        return prompt
+    normalized = []
+    for message in messages:
+        if not isinstance(message, dict):
+            normalized.append(message)
+            continue
+        fields = message.get("kwargs", {})
+        normalized.append({
+            "type": (message.get("id") or [None])[-1],
+            "name": fields.get("name"),
+            "content": fields.get("content"),
+            "tool_calls": [{"name": call.get("name"), "args": call.get("args")} for call in fields.get("tool_calls") or []],
+        })
+    return json.dumps(normalized, sort_keys=True, default=str)
+
+def response_key(prompt, llm_string):
+    """Hash of the normalized messages plus the model and its call parameters (llm_string)."""
+    digest = hashlib.sha256()
+    digest.update(llm_string.encode())
+    digest.update(b"\0")
+    digest.update(normalize_prompt(prompt).encode())
+    return f"llm:{digest.hexdigest()}"
+
+# -------------------- Cache --------------------
+
+class LLMResponseCache(BaseCache):
+    """LangChain chat model cache on top of a memory or sqlite backend from cache.py.
+
+    Entries expire after ttl seconds and the backend evicts the least recently used ones
+    beyond its size bound.
+    """
+
+    def __init__(self, backend, ttl=LLM_CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self._stats = {"hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+
+    def _record(self, outcome):
+        with self._lock:
+            self._stats[outcome] += 1
+
+    def lookup(self, prompt, llm_string):
+        value = self.backend.get(response_key(prompt, llm_string))
+        if value is _MISSING:
+            self._record("misses")
+            return None
+        self._record("hits")
+        return loads(value, allowed_objects=CACHED_OBJECTS)
+
+    def update(self, prompt, llm_string, return_val):
+        self.backend.set(response_key(prompt, llm_string), dumps(return_val), self.ttl)
+
+    def clear(self, **kwargs):
+        self.backend.clear()
+        with self._lock:
+            self._stats = {"hits": 0, "misses": 0}
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, entries=len(self.backend))
+
+def create_llm_cache(backend=LLM_CACHE_BACKEND, path=LLM_CACHE_PATH, max_size=LLM_CACHE_MAX_SIZE, ttl=LLM_CACHE_TTL):
+    store = create_backend(backend, path, max_size)
+    return LLMResponseCache(store, ttl) if store is not None else None
+
+_llm_cache = None
+_llm_cache_configured = False
+_llm_cache_lock = threading.Lock()
+
+def get_llm_cache():
+    """The shared response cache, or None when caching is off."""
+    global _llm_cache, _llm_cache_configured
+    if not _llm_cache_configured:
+        with _llm_cache_lock:
+            if not _llm_cache_configured:
+                _llm_cache = create_llm_cache()
+                _llm_cache_configured = True
+    return _llm_cache
+
+def configure_llm_cache(backend="memory", path=LLM_CACHE_PATH, max_size=LLM_CACHE_MAX_SIZE, ttl=LLM_CACHE_TTL):
+    """Replace the shared response cache ("none" turns it off).
+
+    Chat clients pick it up when they are built, so call this before the first request
+    (or re-register the models).
+    """
+    global _llm_cache, _llm_cache_configured
+    with _llm_cache_lock:
+        _llm_cache = create_llm_cache(backend, path, max_size, ttl)
+        _llm_cache_configured = True
+    return _llm_cache
+
+def llm_cache_stats():
+    """Hits, misses and stored entries of the shared response cache ({} when it is off)."""
+    cache = get_llm_cache()
+    return cache.stats() if cache is not None else {}
@@ -0,0 +1,338 @@
+import importlib
+import os
+import threading
+import time
+from collections import deque
+from langchain_core.runnables import Runnable
+from my_agent.utils.llm_cache import get_llm_cache
+from my_agent.utils.resilience import CircuitBreaker
+
+# -------------------- Model registry --------------------
+# Chat clients are built on first use and cached, so importing the graph does not import
+# every provider SDK or need every provider's API key.
+
+# Set MODELS_PRELOAD=1 to build everything when the graph is imported instead
+PRELOAD = os.environ.get("MODELS_PRELOAD", "") == "1"
+
+# name -> (module, class, constructor kwargs)
+MODEL_SPECS = {
+    "llm": ("langchain_google_genai", "ChatGoogleGenerativeAI", {"model": "gemini-2.0-flash-001"}),
+    "llm_big": ("langchain_openai", "ChatOpenAI", {"model": "gpt-4o"}),
+    "llm_even_bigger": ("langchain_openai", "ChatOpenAI", {
+        "model": "gpt-5",
+        "reasoning_effort": "medium",
+        "streaming": False,
+        "disable_streaming": True,
+    }),
+    "llm_biggest": ("langchain_google_genai", "ChatGoogleGenerativeAI", {"model": "gemini-2.5-pro-exp-03-25"}),
+}
+
+_models = {}
+_models_lock = threading.Lock()
+
+def create_model(name):
+    module_name, class_name, kwargs = MODEL_SPECS[name]
+    model_class = getattr(importlib.import_module(module_name), class_name)
+    cache = get_llm_cache()
+    if cache is not None and "cache" not in kwargs:
+        kwargs = {**kwargs, "cache": cache}
+    return model_class(**kwargs)
+
+def get_model(name):
+    """The chat client registered under name, constructed on first use."""
+    model = _models.get(name)
+    if model is None:
+        with _models_lock:
+            model = _models.get(name)
+            if model is None:
+                model = _models[name] = create_model(name)
+    return model
+
+def register_model(name, module_name, class_name, **kwargs):
+    """Register (or replace) a model spec; an already built client under that name is dropped."""
+    with _models_lock:
+        MODEL_SPECS[name] = (module_name, class_name, kwargs)
+        _models.pop(name, None)
+
+# -------------------- Roles --------------------
+# Nodes ask for a model by role rather than by name. Each role has a chain of registered
+# models: with the "ordered" policy the first healthy one answers and the rest are
+# fallbacks; with "fastest" the healthy ones are tried fastest first, by observed latency.
+# A model is unhealthy while its circuit breaker is open, i.e. after MODEL_BREAKER_FAILURES
+# consecutive failed (or slower than MODEL_SLOW_CALL) calls, for MODEL_BREAKER_COOLDOWN seconds.
+
+ROLE_MODELS = {
+    "supervisor": ["llm"],
+    "extractor": ["llm"],
+    "research": ["llm_big"],
+    "fact_checker": ["llm"],
+    "summarizer": ["llm_even_bigger"],
+}
+ROLE_POLICIES = {}  # role -> policy, overriding MODEL_POLICY
+
+MODEL_POLICY = os.environ.get("MODEL_POLICY", "ordered")  # ordered or fastest
+# Calls slower than this (seconds) count as failures for the model's breaker; 0 disables it
+MODEL_SLOW_CALL = float(os.environ.get("MODEL_SLOW_CALL", "0"))
+MODEL_BREAKER_FAILURES = int(os.environ.get("MODEL_BREAKER_FAILURES", "3"))
+MODEL_BREAKER_COOLDOWN = float(os.environ.get("MODEL_BREAKER_COOLDOWN", "60"))
+# Latencies kept per model, and how many it needs before "fastest" trusts its percentiles
+LATENCY_WINDOW = int(os.environ.get("MODEL_LATENCY_WINDOW", "50"))
+LATENCY_MIN_SAMPLES = int(os.environ.get("MODEL_LATENCY_MIN_SAMPLES", "5"))
+
+def parse_role_models(text):
+    """Role chains from "role=model,model;role=model" (the MODEL_ROLES format)."""
+    chains = {}
+    for entry in filter(None, (part.strip() for part in text.split(";"))):
+        role, _, names = entry.partition("=")
+        chains[role.strip()] = [name.strip() for name in names.split(",") if name.strip()]
+    return chains
+
+ROLE_MODELS.update(parse_role_models(os.environ.get("MODEL_ROLES", "")))
+
+def configure_role(role, models=None, policy=None):
+    """Change a role's model chain or selection policy at runtime; running agents pick it up on their next call."""
+    if models is not None:
+        unknown = [name for name in models if name not in MODEL_SPECS]
+        if unknown or not models:
+            raise ValueError(f"role '{role}' needs registered models, got {models}")
+        ROLE_MODELS[role] = list(models)
+    if policy is not None:
+        if policy not in ("ordered", "fastest"):
+            raise ValueError(f"unknown model policy '{policy}'")
+        ROLE_POLICIES[role] = policy
+
+# -------------------- Health and latency --------------------
+
+_health = {}
+_health_lock = threading.Lock()
+
+def model_health(name):
+    with _health_lock:
+        health = _health.get(name)
+        if health is None:
+            health = _health[name] = {
+                "breaker": CircuitBreaker(MODEL_BREAKER_FAILURES, MODEL_BREAKER_COOLDOWN),
+                "latencies": deque(maxlen=LATENCY_WINDOW),
+                "metrics": {"calls": 0, "failures": 0, "slow": 0, "fallbacks": 0, "shed": 0},
+                "lock": threading.Lock(),
+            }
+        return health
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else None
+
+def latency_percentiles(name):
+    """(p50, p95) of the model's recent successful calls in seconds, or (None, None) with too few samples."""
+    health = model_health(name)
+    with health["lock"]:
+        latencies = list(health["latencies"])
+    if len(latencies) < LATENCY_MIN_SAMPLES:
+        return None, None
+    return percentile(latencies, 0.5), percentile(latencies, 0.95)
+
+def candidate_order(role):
+    """The role's models in the order to try them under its policy."""
+    chain = list(ROLE_MODELS[role])
+    if ROLE_POLICIES.get(role, MODEL_POLICY) == "fastest":
+        # Models without enough samples go first, so every model in the chain gets measured
+        def speed(name):
+            p50, p95 = latency_percentiles(name)
+            return (0, 0, 0) if p95 is None else (1, p95, p50)
+        chain.sort(key=speed)
+    return chain
+
+def _record(name, metric):
+    health = model_health(name)
+    with health["lock"]:
+        health["metrics"][metric] += 1
+
+def _record_call(name, elapsed, error):
+    health = model_health(name)
+    breaker = health["breaker"]
+    slow = MODEL_SLOW_CALL and elapsed > MODEL_SLOW_CALL
+    with health["lock"]:
+        health["metrics"]["calls"] += 1
+        if error is not None:
+            health["metrics"]["failures"] += 1
+        else:
+            health["latencies"].append(elapsed)
+            if slow:
+                health["metrics"]["slow"] += 1
+    if error is not None or slow:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+
+def _attempts(role):
+    """Models to call for one request, in order.
+
+    A model whose breaker is open is skipped (shed); if every model is shed the chain's
+    first one is still tried rather than failing the request outright.
+    """
+    order = candidate_order(role)
+    tried = False
+    for name in order:
+        # allow() is only asked when the model is about to be called: it admits half-open trials
+        if model_health(name)["breaker"].allow():
+            tried = True
+            yield name
+        else:
+            _record(name, "shed")
+    if not tried:
+        yield order[0]
+
+def call_role(role, call):
+    """call(name) against the role's models in turn until one succeeds; the last error is re-raised."""
+    error = None
+    for index, name in enumerate(_attempts(role)):
+        if index:
+            _record(name, "fallbacks")
+        start = time.monotonic()
+        try:
+            result = call(name)
+        except Exception as e:
+            _record_call(name, time.monotonic() - start, e)
+            error = e
+            continue
+        _record_call(name, time.monotonic() - start, None)
+        return result
+    raise error
+
+async def acall_role(role, call):
+    error = None
+    for index, name in enumerate(_attempts(role)):
+        if index:
+            _record(name, "fallbacks")
+        start = time.monotonic()
+        try:
+            result = await call(name)
+        except Exception as e:
+            _record_call(name, time.monotonic() - start, e)
+            error = e
+            continue
+        _record_call(name, time.monotonic() - start, None)
+        return result
+    raise error
+
+def model_stats():
+    """Call, failure and fallback counters, latency percentiles and breaker state for each model."""
+    with _health_lock:
+        names = list(_health)
+    stats = {}
+    for name in names:
+        health = model_health(name)
+        p50, p95 = latency_percentiles(name)
+        with health["lock"]:
+            stats[name] = dict(health["metrics"], p50=p50, p95=p95, breaker=health["breaker"].state)
+    return stats
+
+def reset_model_stats():
+    """Forget all latency, breaker and counter state."""
+    with _health_lock:
+        _health.clear()
+
+class RoleModel(Runnable):
+    """Chat model for a role: each call goes to the model picked by the role's chain and policy.
+
+    bind_tools and with_structured_output are applied to whichever model is picked; the
+    result for each model is built once and reused.
+    """
+
+    def __init__(self, role, build=None):
+        self.role = role
+        self._build = build or (lambda model: model)
+        self._runnables = {}
+
+    def bind_tools(self, tools, **kwargs):
+        return RoleModel(self.role, lambda model: self._build(model).bind_tools(tools, **kwargs))
+
+    def with_structured_output(self, schema, **kwargs):
+        return RoleModel(self.role, lambda model: self._build(model).with_structured_output(schema, **kwargs))
+
+    def runnable(self, name):
+        model = get_model(name)
+        cached = self._runnables.get(name)
+        if cached is None or cached[0] is not model:  # rebuilt if register_model replaced it
+            cached = self._runnables[name] = (model, self._build(model))
+        return cached[1]
+
+    def invoke(self, input, config=None, **kwargs):
+        return call_role(self.role, lambda name: self.runnable(name).invoke(input, config, **kwargs))
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        return await acall_role(self.role, lambda name: self.runnable(name).ainvoke(input, config, **kwargs))
+
+def role_model(role):
+    if role not in ROLE_MODELS:
+        raise ValueError(f"no models configured for role '{role}'")
+    return RoleModel(role)
+
+# -------------------- Lazy objects --------------------
+
+_lazy_objects = []
+
+class Lazy:
+    """Build an object on first use and delegate attribute access to it.
+
+    Used for models, compiled agents and structured-output routers so their cost is paid
+    by the first request that needs them rather than at import.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._value = None
+        self._lock = threading.Lock()
+        _lazy_objects.append(self)
+
+    def get(self):
+        if self._value is None:
+            with self._lock:
+                if self._value is None:
+                    self._value = self._factory()
+        return self._value
+
+    @property
+    def built(self):
+        return self._value is not None
+
+    # Defined explicitly rather than only via __getattr__: LangGraph inspects the objects a
+    # node closes over when compiling the graph, and looking these up must not build them.
+    def invoke(self, *args, **kwargs):
+        return self.get().invoke(*args, **kwargs)
+
+    async def ainvoke(self, *args, **kwargs):
+        return await self.get().ainvoke(*args, **kwargs)
+
+    def stream(self, *args, **kwargs):
+        return self.get().stream(*args, **kwargs)
+
+    def astream(self, *args, **kwargs):
+        return self.get().astream(*args, **kwargs)
+
+    def with_structured_output(self, *args, **kwargs):
+        return self.get().with_structured_output(*args, **kwargs)
+
+    def bind_tools(self, *args, **kwargs):
+        return self.get().bind_tools(*args, **kwargs)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.get(), name)
+
+def lazy_model(name):
+    return Lazy(lambda: get_model(name))
+
+def resolve(value):
+    """The real object behind a Lazy, or value itself."""
+    return value.get() if isinstance(value, Lazy) else value
+
+def preload_enabled():
+    return PRELOAD
+
+def preload():
+    """Build every Lazy object created so far, e.g. to warm a server up before its first request."""
+    for value in list(_lazy_objects):
+        value.get()
+    return len(_lazy_objects)
@@ -1,21 +1,38 @@
+import asyncio
+import functools
+import inspect
 import json
 import logging
+import os
 from typing import Literal, List, TypedDict, Any
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_anthropic import ChatAnthropic
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, BaseMessage
 from langchain_core.messages.utils import convert_to_messages
 from langgraph.prebuilt import create_react_agent
-from langgraph.types import Command
+from langgraph.types import Command, Send
 from my_agent.utils.tools import (
     trending_keywords_sources_tool, 
     top_keywords_sources_tool, 
     keyword_source_search_tool,
     read_notes,
     write_notes,
-    get_or_create_notes_file
+    get_notes_store,
+    atrending_keywords_sources_tool,
+    atop_keywords_sources_tool,
+    akeyword_source_search_tool,
+    aread_notes,
+    awrite_notes,
+    stream_keywords_report,
+    astream_keywords_report
 )
+from my_agent.utils.notes import section_key, notes_session, run_session_id, close_session
+from my_agent.utils.context import build_context_window
+from my_agent.utils.cache import MemoryCache, _MISSING
+from my_agent.utils.routing import (
+    plan_step, plan_route, team_progress, main_progress, rules_enabled, record_decision,
+    parallel_enabled, parallel_phase, dispatch_text
+)
+from my_agent.utils.models import Lazy, resolve, role_model
+from my_agent.utils.executor import direct_tool, direct_enabled, run_direct_node, arun_direct_node
 from my_agent.utils.state import MultiAgentState
 from langgraph.graph import END
 from datetime import datetime
@@ -23,21 +40,13 @@ from datetime import datetime
 today = datetime.now().strftime("%Y-%m-%d")
 logger = logging.getLogger(__name__)
 
-# -------------------- LLMs --------------------
-
-llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash-001")
-llm_big = ChatOpenAI(model="gpt-4o")
-llm_even_bigger = ChatOpenAI(
-    model="gpt-5",
-    reasoning_effort="medium",
-    streaming=False,
-    disable_streaming=True,
-)
-llm_biggest = ChatGoogleGenerativeAI(model="gemini-2.5-pro-exp-03-25")
-
 # -------------------- Supervisor nodes --------------------
 
-def make_top_level_supervisor_node(members: list[str], system_prompt: str) -> str:
+def make_top_level_supervisor_node(members: list[str], system_prompt: str, asynchronous: bool = False, model=None, plan=None) -> str:
+    """Build the main supervisor node; model is the routing chat model (the "supervisor" role by default).
+
+    plan is a list of plan_step()s followed in rule-based routing mode (SUPERVISOR_ROUTING=rules).
+    """
     options = ["FINISH"] + members
 
     class Router(TypedDict):
@@ -45,26 +54,27 @@ def make_top_level_supervisor_node(members: list[str], system_prompt: str) -> st
         next: Literal[*options]
         instruction: str  
 
-    def supervisor_node(state: MultiAgentState) -> Command[Literal[*members, "__end__"]]:
-        """An LLM-based router with authority to end the workflow."""
-        messages = prepare_supervisor_messages(system_prompt, state["messages"])
-        response = llm.with_structured_output(Router).invoke(messages)
+    # Built once, on first use: deriving the schema and wrapping the model is not free on every hop
+    router = Lazy(lambda: resolve(model or role_model("supervisor")).with_structured_output(Router))
+
+    def route(state: MultiAgentState, response: Router, context_update: dict, formatted_summary: str = None) -> Command[Literal[*members, "__end__"]]:
+        """The Command for a routing decision; formatted_summary is the final summary when it is FINISH."""
         goto = response["next"]
         instruction = response["instruction"]
         
         if goto == "FINISH":
             goto = END
 
-            formatted_summary = extract_final_summary()
             instruction = f"{instruction}\n\n# FINAL RESEARCH SUMMARY\n\n{formatted_summary}"
             
             return Command(
                 goto=goto, 
                 update={
                     "next": goto,
-                    "messages": state["messages"] + [
+                    "messages": [
                         AIMessage(content=instruction, name="supervisor")
-                    ]
+                    ],
+                    **context_update
                 }
             )
 
@@ -72,28 +82,80 @@ def make_top_level_supervisor_node(members: list[str], system_prompt: str) -> st
             goto=goto, 
             update={
                 "next": goto,
-                "messages": state["messages"] + [
+                "messages": [
                     HumanMessage(
                         content=f"[INSTRUCTION FROM MAIN SUPERVISOR]\n{instruction}",
                         name="supervisor"
                     )
-                ]
+                ],
+                **context_update
             }
         )
 
-    return supervisor_node
+    def planned_route(state: MultiAgentState):
+        if plan is None or not rules_enabled():
+            return None
+        return plan_route(plan, main_progress(run_messages(state["messages"])), user_request(state["messages"]))
 
-def make_team_supervisor_node(members: list[str], parent: str, system_prompt: str, team):
+    def supervisor_node(state: MultiAgentState) -> Command[Literal[*members, "__end__"]]:
+        """An LLM-based router with authority to end the workflow."""
+        response = planned_route(state)
+        context_update = {}
+        if response is not None:
+            record_decision("rules")
+        else:
+            messages, context_update = prepare_supervisor_context(system_prompt, state)
+            response = router.invoke(messages)
+            record_decision("llm")
+        formatted_summary = extract_final_summary() if response["next"] == "FINISH" else None
+        return route(state, response, context_update, formatted_summary)
+
+    async def asupervisor_node(state: MultiAgentState) -> Command[Literal[*members, "__end__"]]:
+        """Async LLM-based router with authority to end the workflow."""
+        response = planned_route(state)
+        context_update = {}
+        if response is not None:
+            record_decision("rules")
+        else:
+            messages, context_update = prepare_supervisor_context(system_prompt, state)
+            response = await router.ainvoke(messages)
+            record_decision("llm")
+        # Reading the notes store is blocking file or sqlite I/O
+        formatted_summary = await asyncio.to_thread(extract_final_summary) if response["next"] == "FINISH" else None
+        return route(state, response, context_update, formatted_summary)
+
+    return asupervisor_node if asynchronous else supervisor_node
+
+def make_team_supervisor_node(members: list[str], parent: str, system_prompt: str, team, asynchronous: bool = False, model=None, plan=None, parallel=False):
+    """Build a team supervisor node; model is the routing chat model (the "supervisor" role by default).
+
+    plan is a list of plan_step()s followed in rule-based routing mode (SUPERVISOR_ROUTING=rules).
+    parallel lets the team dispatch all its workers at once in parallel research mode
+    (RESEARCH_MODE=parallel): one Send per worker, joined back here before the team finishes.
+    """
     options = ["FINISH"] + members
 
     class Router(TypedDict):
         next: Literal[*options]
         instruction: str 
 
-    def team_supervisor_node(state: MultiAgentState) -> Command[Literal[*members, parent]]:
-        messages = prepare_supervisor_messages(system_prompt, state["messages"])
-        
-        response = llm.with_structured_output(Router).invoke(messages)
+    class Task(TypedDict):
+        next: Literal[*members]
+        instruction: str
+
+    class ParallelRouter(TypedDict):
+        """Workers to run at the same time, each with its own instruction."""
+        tasks: list[Task]
+
+    router = Lazy(lambda: resolve(model or role_model("supervisor")).with_structured_output(Router))
+    parallel_router = Lazy(lambda: resolve(model or role_model("supervisor")).with_structured_output(ParallelRouter)) if parallel else None
+    parallel_prompt = (
+        f"{system_prompt}\n\nPARALLEL MODE: the agents you choose now all run at the same time and "
+        "cannot see each other's results. Return every agent needed for this request in one plan, "
+        "each at most once, with its own complete instruction."
+    )
+
+    def route(state: MultiAgentState, response: Router, context_update: dict) -> Command[Literal[*members, parent]]:
         goto = response["next"]
         instruction = response.get("instruction", "Please perform your task clearly without questions")
 
@@ -101,25 +163,117 @@ def make_team_supervisor_node(members: list[str], parent: str, system_prompt: st
             goto = parent
             return Command(goto=goto, update={
                 "next": goto, 
-                "messages": state["messages"] + [
+                "messages": [
                     AIMessage(content=f"Research complete. Response from the {team} team supervisor: {instruction}")
-                ]
+                ],
+                **context_update
             })
 
         return Command(
             goto=goto, 
             update={
                 "next": goto,
-                "messages": state["messages"] + [
+                "messages": [
                     HumanMessage(
                         content=f"[INSTRUCTION FROM {team} TEAM SUPERVISOR]\n{instruction}",
                         name="supervisor"
                     )
-                ]
+                ],
+                **context_update
+            }
+        )
+
+    def planned_route(state: MultiAgentState):
+        if plan is None or not rules_enabled():
+            return None
+        return plan_route(plan, team_progress(state["messages"], team), user_request(state["messages"]))
+
+    def parallel_phase_of(state: MultiAgentState):
+        if not parallel or not parallel_enabled():
+            return None
+        return parallel_phase(state["messages"], team)
+
+    def planned_tasks(state: MultiAgentState):
+        if plan is None or not rules_enabled():
+            return None
+        request = user_request(state["messages"])
+        return [{"next": step["next"], "instruction": step["instruction"].format(request=request)} for step in plan]
+
+    def dispatch(state: MultiAgentState, tasks: list, context_update: dict) -> Command:
+        """Fan the tasks out to their workers; they all report back here, where they are joined."""
+        unique_tasks = list({task["next"]: task for task in tasks if task["next"] in members}.values())
+        if not unique_tasks:
+            unique_tasks = [{"next": members[0], "instruction": "Please perform your task clearly without questions"}]
+        request = run_request_message(state["messages"]) or state["messages"][0]
+        sends = [
+            Send(task["next"], {"messages": [
+                request,
+                HumanMessage(content=f"[INSTRUCTION FROM {team} TEAM SUPERVISOR]\n{task['instruction']}", name="supervisor")
+            ]})
+            for task in unique_tasks
+        ]
+        return Command(
+            goto=sends,
+            update={
+                "next": ", ".join(task["next"] for task in unique_tasks),
+                "messages": [HumanMessage(content=dispatch_text(team, unique_tasks), name="supervisor")],
+                **context_update
             }
         )
 
-    return team_supervisor_node
+    def joined(state: MultiAgentState) -> Command:
+        record_decision("rules")
+        return route(state, {"next": "FINISH", "instruction": "All parallel research tasks are complete."}, {})
+
+    def team_supervisor_node(state: MultiAgentState) -> Command[Literal[*members, parent]]:
+        phase = parallel_phase_of(state)
+        if phase == "joined":
+            return joined(state)
+        if phase == "dispatch":
+            tasks = planned_tasks(state)
+            if tasks is not None:
+                record_decision("rules")
+                return dispatch(state, tasks, {})
+            messages, context_update = prepare_supervisor_context(parallel_prompt, state)
+            response = parallel_router.invoke(messages)
+            record_decision("llm")
+            return dispatch(state, response.get("tasks") or [], context_update)
+
+        response = planned_route(state)
+        if response is not None:
+            record_decision("rules")
+            return route(state, response, {})
+        messages, context_update = prepare_supervisor_context(system_prompt, state)
+        
+        response = router.invoke(messages)
+        record_decision("llm")
+        return route(state, response, context_update)
+
+    async def ateam_supervisor_node(state: MultiAgentState) -> Command[Literal[*members, parent]]:
+        phase = parallel_phase_of(state)
+        if phase == "joined":
+            return joined(state)
+        if phase == "dispatch":
+            tasks = planned_tasks(state)
+            if tasks is not None:
+                record_decision("rules")
+                return dispatch(state, tasks, {})
+            messages, context_update = prepare_supervisor_context(parallel_prompt, state)
+            response = await parallel_router.ainvoke(messages)
+            record_decision("llm")
+            return dispatch(state, response.get("tasks") or [], context_update)
+
+        response = planned_route(state)
+        if response is not None:
+            record_decision("rules")
+            return route(state, response, {})
+        messages, context_update = prepare_supervisor_context(system_prompt, state)
+
+        response = await router.ainvoke(messages)
+        record_decision("llm")
+        return route(state, response, context_update)
+
+    return ateam_supervisor_node if asynchronous else team_supervisor_node
 
 # -------------------- RESEARCH TEAM --------------------
 
@@ -143,15 +297,19 @@ YOU DO NOT RETURN THE RESEARCH TO THE SUPERVISOR, YOU SAVE IT TO THE DOCUMENT (u
 After you've saved the research with the tools, you can tell the supervisor you are done are done with a simple "I'm done, I have saved all the research in the document". 
 """
 
-trending_keywords_agent = create_react_agent(
-    llm_big,
+trending_keywords_agent = Lazy(lambda: create_react_agent(
+    role_model("research"),
     tools=[trending_keywords_sources_tool, write_notes],
     prompt=trending_keywords_prompt_template
-)
+))
 
 def trending_keywords_node(state: MultiAgentState) -> Command:
     """Node for fetching trending keywords."""
     filtered_state = optimize_agent_state(state)
+    if direct_enabled():
+        command = direct_research_node(filtered_state, "trending_keywords_agent", "trending_keywords_agent", "research_supervisor")
+        if command is not None:
+            return command
     
     result = trending_keywords_agent.invoke(filtered_state)
     agent_messages = [msg for msg in result["messages"] if msg.content.strip()]
@@ -161,7 +319,7 @@ def trending_keywords_node(state: MultiAgentState) -> Command:
 
     return Command(
         update={
-            "messages": state["messages"] + [
+            "messages": [
                 AIMessage(content=completed_label + agent_content, name="trending_keywords_agent")
             ]
         },
@@ -187,15 +345,19 @@ REQUIRED STEPS:
 YOU DO NOT RETURN THE RESULTS TO THE SUPERVISOR, YOU SAVE IT TO THE DOCUMENT (using write_notes). After you've saved the research with the tools, you can tell the supervisor you are done are done with a simple "I'm done, I have saved all the research in the document". 
 """
 
-top_keywords_agent = create_react_agent(
-    llm_big,
+top_keywords_agent = Lazy(lambda: create_react_agent(
+    role_model("research"),
     tools=[top_keywords_sources_tool, write_notes],
     prompt=top_keywords_prompt_template
-)
+))
 
 def top_keywords_node(state: MultiAgentState) -> Command:
     """Node for finding top keywords and their sources."""
     filtered_state = optimize_agent_state(state)
+    if direct_enabled():
+        command = direct_research_node(filtered_state, "top_keywords_agent", "top_keywords_agent", "research_supervisor")
+        if command is not None:
+            return command
     
     result = top_keywords_agent.invoke(filtered_state)
     agent_messages = [msg for msg in result["messages"] if msg.content.strip()]
@@ -205,7 +367,7 @@ def top_keywords_node(state: MultiAgentState) -> Command:
 
     return Command(
         update={
-            "messages": state["messages"] + [
+            "messages": [
                 AIMessage(content=completed_label + agent_content, name="top_keywords_agent")
             ]
         },
@@ -231,15 +393,19 @@ REQUIRED STEPS:
 YOU DO NOT RETURN THE RESULTS TO THE SUPERVISOR, YOU SAVE IT TO THE DOCUMENT (using write_notes). After you've saved the research with the tools, you can tell the supervisor you are done are done with a simple "I'm done, I have saved all the research in the document". 
 """
 
-search_keywords_agent = create_react_agent(
-    llm_big,
+search_keywords_agent = Lazy(lambda: create_react_agent(
+    role_model("research"),
     tools=[keyword_source_search_tool, write_notes],
     prompt=search_keywords_prompt_template
-)
+))
 
 def search_keywords_node(state: MultiAgentState) -> Command:
     """Node for searching for keywords in tech social media."""
     filtered_state = optimize_agent_state(state)
+    if direct_enabled():
+        command = direct_research_node(filtered_state, "search_keywords_agent", "search_keywords_agent", "research_supervisor")
+        if command is not None:
+            return command
     
     result = search_keywords_agent.invoke(filtered_state)
     agent_messages = [msg for msg in result["messages"] if msg.content.strip()]
@@ -249,7 +415,7 @@ def search_keywords_node(state: MultiAgentState) -> Command:
 
     return Command(
         update={
-            "messages": state["messages"] + [
+            "messages": [
                 AIMessage(content=completed_label + agent_content, name="search_keywords_agent")
             ]
         },
@@ -273,15 +439,19 @@ REQUIRED STEPS:
 YOU DO NOT RETURN THE RESULTS TO THE SUPERVISOR, YOU SAVE IT TO THE DOCUMENT (using write_notes). After you've saved the research with the tools, you can tell the supervisor you are done are done with a simple "I'm done, I have saved all the research in the document". 
 """
 
-trending_github_repos_agent = create_react_agent(
-    llm_big,
+trending_github_repos_agent = Lazy(lambda: create_react_agent(
+    role_model("research"),
     tools=[keyword_source_search_tool, write_notes],
     prompt=github_trending_repos_prompt_template
-)
+))
 
 def github_keywords_node(state: MultiAgentState) -> Command:
     """Node for searching for keywords in tech social media."""
     filtered_state = optimize_agent_state(state)
+    if direct_enabled():
+        command = direct_research_node(filtered_state, "trending_github_repos_agent", "search_keywords_agent", "research_supervisor")
+        if command is not None:
+            return command
     
     result = trending_github_repos_agent.invoke(filtered_state)
     agent_messages = [msg for msg in result["messages"] if msg.content.strip()]
@@ -291,7 +461,7 @@ def github_keywords_node(state: MultiAgentState) -> Command:
 
     return Command(
         update={
-            "messages": state["messages"] + [
+            "messages": [
                 AIMessage(content=completed_label + agent_content, name="search_keywords_agent")
             ]
         },
@@ -331,11 +501,81 @@ Response format:
 
 Today's date: {today}."""
 
+# Direct execution (RESEARCH_EXECUTION=direct): the tool each research agent would call,
+# the notes section it writes, and what the instruction must name to skip the model call
+DIRECT_TOOLS = {
+    "trending_keywords_agent": direct_tool(
+        trending_keywords_sources_tool, atrending_keywords_sources_tool, "Trending Keywords Analysis",
+        required=("categories", "period"),
+        stream=functools.partial(stream_keywords_report, "trending_keywords_sources_tool", "trending"),
+        astream=functools.partial(astream_keywords_report, "trending_keywords_sources_tool", "trending")
+    ),
+    "top_keywords_agent": direct_tool(
+        top_keywords_sources_tool, atop_keywords_sources_tool, "Top Keywords Analysis",
+        required=("categories", "period"),
+        stream=functools.partial(stream_keywords_report, "top_keywords_sources_tool", "top"),
+        astream=functools.partial(astream_keywords_report, "top_keywords_sources_tool", "top")
+    ),
+    "search_keywords_agent": direct_tool(
+        keyword_source_search_tool, akeyword_source_search_tool, "Specific Keyword Search Results",
+        required=("keywords",)
+    ),
+    "trending_github_repos_agent": direct_tool(
+        keyword_source_search_tool, akeyword_source_search_tool, "Trending Github repositories for keywords",
+        fixed={"source": "github"}, defaults={"period": "weekly"}, required=("keywords",)
+    ),
+}
+# One structured-output argument extractor per agent, on the cheap routing model
+ARGUMENT_EXTRACTORS = {
+    agent_name: Lazy(lambda spec=spec: role_model("extractor").with_structured_output(spec["tool"].args_schema))
+    for agent_name, spec in DIRECT_TOOLS.items()
+}
+
+def direct_request(filtered_state):
+    """The user request and the latest supervisor instruction from an optimized agent state."""
+    messages = filtered_state["messages"]
+    request = _coerce_message_content_to_text(messages[0].content) if messages else ""
+    instruction = _coerce_message_content_to_text(messages[-1].content) if len(messages) > 1 else request
+    return request, instruction
+
+def direct_research_node(filtered_state, agent_name: str, message_name: str, goto: str):
+    """Run a research agent's tool without its ReAct loop; None if that failed and the agent should run."""
+    request, instruction = direct_request(filtered_state)
+    try:
+        return run_direct_node(
+            DIRECT_TOOLS[agent_name], request, instruction, agent_name, message_name, goto,
+            ARGUMENT_EXTRACTORS[agent_name]
+        )
+    except Exception:
+        logger.exception("Direct execution failed for %s; running the agent instead", agent_name)
+        return None
+
+async def adirect_research_node(filtered_state, agent_name: str, message_name: str, goto: str):
+    """Async direct_research_node."""
+    request, instruction = direct_request(filtered_state)
+    try:
+        return await arun_direct_node(
+            DIRECT_TOOLS[agent_name], request, instruction, agent_name, message_name, goto,
+            ARGUMENT_EXTRACTORS[agent_name]
+        )
+    except Exception:
+        logger.exception("Direct execution failed for %s; running the agent instead", agent_name)
+        return None
+
+# Order the research supervisor follows in rule-based routing mode
+RESEARCH_PLAN = [
+    plan_step("trending_keywords_agent", "Fetch trending keywords and their sources for the 3-4 categories and the period that best fit the user's request: {request}"),
+    plan_step("top_keywords_agent", "Fetch the most-mentioned keywords and their sources for 3-4 categories (different from the trending ones where possible) and the period that best fit the user's request: {request}"),
+    plan_step("keyword_search_agent", "Search the specific keywords the user asked to track, or the 1-2 keywords most relevant to their request, over a fitting period: {request}", done="search_keywords_agent"),
+]
+
 research_supervisor_node = make_team_supervisor_node(
     members=["trending_keywords_agent", "top_keywords_agent", "keyword_search_agent", "trending_github_repos_agent"],
     parent="supervisor",
     system_prompt=RESEARCH_SUPERVISOR_PROMPT,
-    team="RESEARCH"
+    team="RESEARCH",
+    plan=RESEARCH_PLAN,
+    parallel=True
 )
 
 # -------------------- EDITING TEAM --------------------
@@ -347,7 +587,7 @@ Your tools:
 2. write_notes: Document your assessment under "Fact Check Report" section
 
 REQUIRED STEPS:
-1. FIRST use read_notes to review all collected research
+1. FIRST use read_notes with digest=True to review all collected research (a compact overview with the top sources per keyword)
 2. Write ONLY 1-2 short paragraphs (maximum 150 words total) assessing the overall quality and reliability of the research
 3. Focus on the general trustworthiness of sources and any notable concerns or strengths
 4. DO NOT do a detailed fact-by-fact verification
@@ -357,11 +597,11 @@ REQUIRED STEPS:
 ⚠️ IMPORTANT: Step 5 is MANDATORY - you MUST save your assessment to the shared document using write_notes ⚠️
 """
 
-fact_checker_agent = create_react_agent(
-    llm,
+fact_checker_agent = Lazy(lambda: create_react_agent(
+    role_model("fact_checker"),
     tools=[read_notes, write_notes],
     prompt=fact_checker_prompt_template
-)
+))
 
 def fact_checker_node(state: MultiAgentState) -> Command:
     """Node for checking facts in research."""
@@ -376,7 +616,7 @@ def fact_checker_node(state: MultiAgentState) -> Command:
 
     return Command(
         update={
-            "messages": state["messages"] + [
+            "messages": [
                 AIMessage(content=completed_label + agent_content, name="fact_checker_agent")
             ]
         },
@@ -393,7 +633,7 @@ Your tools that YOU MUST USE:
 2. write_notes: Save your final summary under the "Final Summary" section
 
 REQUIRED STEPS:
-1. FIRST use read_notes to review all research findings and fact-check reports
+1. FIRST use read_notes with digest=True to review all research findings and fact-check reports (the top sources per keyword are kept; call read_notes with sections=[...] if you need a full section)
 2. Look through through all the messages in state.
 2. DO NOT simply copy the entire research document - you must actually synthesize the most INTERESTING insights
 3. Create a focused summary with these components:
@@ -428,11 +668,11 @@ Bill Gates' comments on AI's potential to replace human roles underscore growing
 ⚠️ IMPORTANT: Your summary should contain information that would be NEWS to someone who hasn't followed tech for the period they are asking. ⚠️
 """
 
-summarizer_agent = create_react_agent(
-    llm_even_bigger,
+summarizer_agent = Lazy(lambda: create_react_agent(
+    role_model("summarizer"),
     tools=[read_notes, write_notes],
     prompt=summarizer_prompt_template
-)
+))
 
 def summarizer_node(state: MultiAgentState) -> Command:
     """Node for summarizing research content."""
@@ -445,7 +685,7 @@ def summarizer_node(state: MultiAgentState) -> Command:
     
     return Command(
         update={
-            "messages": state["messages"] + [
+            "messages": [
                 AIMessage(content=completed_label + agent_content, name="summarizer_agent")
             ]
         },
@@ -468,11 +708,17 @@ Respond strictly with:
 Once you have produced a final edited report, reply with FINISH to return to the main supervisor.
 """
 
+EDITING_PLAN = [
+    plan_step("fact_checker", "Read the research notes and write a short assessment of the sources' reliability under 'Fact Check Report'.", done="fact_checker_agent"),
+    plan_step("summarizer", "Read the research notes and the fact check, then write the final summary for this request under 'Final Summary': {request}", done="summarizer_agent"),
+]
+
 editing_supervisor_node = make_team_supervisor_node(
     members=["fact_checker", "summarizer"], 
     parent="supervisor",
     system_prompt=EDITING_SUPERVISOR_PROMPT,
-    team="EDITING"
+    team="EDITING",
+    plan=EDITING_PLAN
 )
 
 # -------------------- MAIN SUPERVISOR --------------------
@@ -495,23 +741,230 @@ Respond strictly with:
 DO NOT end the process prematurely. Each team must complete their full workflow.
 """
 
+MAIN_PLAN = [
+    plan_step("research_supervisor", "Research what is happening in tech for this request, using the trending, top and keyword search agents: {request}", done="RESEARCH"),
+    plan_step("editing_supervisor", "Fact check the research and produce the final summary for this request: {request}", done="EDITING"),
+]
+
 supervisor_node = make_top_level_supervisor_node(
     ["research_supervisor", "editing_supervisor"],
-    MAIN_SUPERVISOR_PROMPT
+    MAIN_SUPERVISOR_PROMPT,
+    plan=MAIN_PLAN
+)
+
+# -------------------- ASYNC NODES --------------------
+# Event-loop variants of every node. The agents are built over the async tools so a
+# single process can interleave many research runs without a thread per run.
+
+atrending_keywords_agent = Lazy(lambda: create_react_agent(
+    role_model("research"),
+    tools=[atrending_keywords_sources_tool, awrite_notes],
+    prompt=trending_keywords_prompt_template
+))
+
+atop_keywords_agent = Lazy(lambda: create_react_agent(
+    role_model("research"),
+    tools=[atop_keywords_sources_tool, awrite_notes],
+    prompt=top_keywords_prompt_template
+))
+
+asearch_keywords_agent = Lazy(lambda: create_react_agent(
+    role_model("research"),
+    tools=[akeyword_source_search_tool, awrite_notes],
+    prompt=search_keywords_prompt_template
+))
+
+atrending_github_repos_agent = Lazy(lambda: create_react_agent(
+    role_model("research"),
+    tools=[akeyword_source_search_tool, awrite_notes],
+    prompt=github_trending_repos_prompt_template
+))
+
+afact_checker_agent = Lazy(lambda: create_react_agent(
+    role_model("fact_checker"),
+    tools=[aread_notes, awrite_notes],
+    prompt=fact_checker_prompt_template
+))
+
+asummarizer_agent = Lazy(lambda: create_react_agent(
+    role_model("summarizer"),
+    tools=[aread_notes, awrite_notes],
+    prompt=summarizer_prompt_template
+))
+
+async def arun_agent_node(agent, state: MultiAgentState, agent_name: str, message_name: str, goto: str, optimize: bool = True) -> Command:
+    """Run a ReAct agent with ainvoke and report its last message back to the supervisor.
+
+    Agents with a direct tool run it without the ReAct loop in direct execution mode.
+    """
+    agent_state = optimize_agent_state(state) if optimize else state
+
+    if agent_name in DIRECT_TOOLS and direct_enabled():
+        command = await adirect_research_node(agent_state, agent_name, message_name, goto)
+        if command is not None:
+            return command
+
+    result = await agent.ainvoke(agent_state)
+    agent_messages = [msg for msg in result["messages"] if msg.content.strip()]
+    agent_content = agent_messages[-1].content if agent_messages else "No valid results."
+
+    completed_label = f"[COMPLETED {agent_name}]\n"
+
+    return Command(
+        update={
+            "messages": [
+                AIMessage(content=completed_label + agent_content, name=message_name)
+            ]
+        },
+        goto=goto,
+    )
+
+async def atrending_keywords_node(state: MultiAgentState) -> Command:
+    """Async node for fetching trending keywords."""
+    return await arun_agent_node(atrending_keywords_agent, state, "trending_keywords_agent", "trending_keywords_agent", "research_supervisor")
+
+async def atop_keywords_node(state: MultiAgentState) -> Command:
+    """Async node for finding top keywords and their sources."""
+    return await arun_agent_node(atop_keywords_agent, state, "top_keywords_agent", "top_keywords_agent", "research_supervisor")
+
+async def asearch_keywords_node(state: MultiAgentState) -> Command:
+    """Async node for searching for keywords in tech social media."""
+    return await arun_agent_node(asearch_keywords_agent, state, "search_keywords_agent", "search_keywords_agent", "research_supervisor")
+
+async def agithub_keywords_node(state: MultiAgentState) -> Command:
+    """Async node for searching trending github repositories."""
+    return await arun_agent_node(atrending_github_repos_agent, state, "trending_github_repos_agent", "search_keywords_agent", "research_supervisor")
+
+async def afact_checker_node(state: MultiAgentState) -> Command:
+    """Async node for checking facts in research."""
+    return await arun_agent_node(afact_checker_agent, state, "fact_checker_agent", "fact_checker_agent", "editing_supervisor")
+
+async def asummarizer_node(state: MultiAgentState) -> Command:
+    """Async node for summarizing research content."""
+    return await arun_agent_node(asummarizer_agent, state, "summarizer_agent", "summarizer_agent", "editing_supervisor", optimize=False)
+
+aresearch_supervisor_node = make_team_supervisor_node(
+    members=["trending_keywords_agent", "top_keywords_agent", "keyword_search_agent", "trending_github_repos_agent"],
+    parent="supervisor",
+    system_prompt=RESEARCH_SUPERVISOR_PROMPT,
+    team="RESEARCH",
+    asynchronous=True,
+    plan=RESEARCH_PLAN,
+    parallel=True
+)
+
+aediting_supervisor_node = make_team_supervisor_node(
+    members=["fact_checker", "summarizer"], 
+    parent="supervisor",
+    system_prompt=EDITING_SUPERVISOR_PROMPT,
+    team="EDITING",
+    asynchronous=True,
+    plan=EDITING_PLAN
+)
+
+asupervisor_node = make_top_level_supervisor_node(
+    ["research_supervisor", "editing_supervisor"],
+    MAIN_SUPERVISOR_PROMPT,
+    asynchronous=True,
+    plan=MAIN_PLAN
 )
 
 # -------------------- HELPERS --------------------
 
+def run_request_message(state_messages: List[Any]):
+    """The user message that started the current run: the latest human message not sent by a supervisor."""
+    for message in reversed(state_messages):
+        if isinstance(message, HumanMessage) and message.name != "supervisor":
+            return message
+    return None
+
+def run_messages(state_messages: List[Any]) -> List[Any]:
+    """The messages of the current run, from its user message on."""
+    request = run_request_message(state_messages)
+    if request is None:
+        return state_messages
+    index = max(i for i, message in enumerate(state_messages) if message is request)
+    return state_messages[index:]
+
+def with_run_notes(node):
+    """Wrap a graph node so the notes it and its agents read and write belong to its run.
+
+    The session is the thread plus the ID of the run's user message, so each run on a
+    thread starts a fresh document.
+    """
+    def session(state):
+        request = run_request_message(state["messages"])
+        return run_session_id(request.id if request is not None else None)
+
+    if inspect.iscoroutinefunction(node):
+        @functools.wraps(node)
+        async def scoped(state):
+            with notes_session(session(state)):
+                return await node(state)
+    else:
+        @functools.wraps(node)
+        def scoped(state):
+            with notes_session(session(state)):
+                return node(state)
+    return scoped
+
+def user_request(state_messages: List[Any]) -> str:
+    """The user request of the current run (earlier runs on the thread may precede it)."""
+    request = run_request_message(state_messages)
+    if request is None:
+        request = state_messages[0] if state_messages else None
+    return _coerce_message_content_to_text(request.content) if request is not None else ""
+
+
 def prepare_supervisor_messages(system_prompt: str, state_messages: List[Any]) -> List[BaseMessage]:
     """Normalize state messages so Gemini always receives plain-text content."""
-    history = convert_to_messages(state_messages or [])
+    history = normalize_history(state_messages)
+    return [SystemMessage(content=system_prompt), *history]
+
+
+def prepare_supervisor_context(system_prompt: str, state: MultiAgentState):
+    """Build a supervisor's input from the state: normalized history in a rolling context window.
+
+    Returns the messages to send and the state update (the running summary) that the
+    supervisor writes back.
+    """
+    history = normalize_history(state["messages"])
+    request = run_request_message(state["messages"])
+    messages, summary = build_context_window(
+        system_prompt, history, state.get("context_summary"),
+        request_id=request.id if request is not None else None
+    )
+    update = {}
+    if summary is not None:
+        update["context_summary"] = summary
+    return messages, update
+
+
+# Normalized form of each message seen by a supervisor, keyed by message ID. It lives in
+# the process rather than the state so checkpoints do not hold a second copy of the history.
+NORMALIZED_CACHE_SIZE = int(os.environ.get("SUPERVISOR_NORMALIZED_CACHE_SIZE", "4096"))
+NORMALIZED_CACHE_TTL = float(os.environ.get("SUPERVISOR_NORMALIZED_CACHE_TTL", "3600"))
+_normalized_cache = MemoryCache(max_size=NORMALIZED_CACHE_SIZE)
+
+def normalize_history(state_messages: List[Any]):
+    """Normalize state messages, reusing the cached form of messages seen before.
+
+    Only messages missing from the cache (or whose content changed under the same ID) are
+    coerced and copied; messages without text are dropped.
+    """
     normalized_history: List[BaseMessage] = []
 
-    for message in history:
-        content_text = _coerce_message_content_to_text(message.content)
-        if not content_text:
-            continue
-        normalized_history.append(message.model_copy(update={"content": content_text}))
+    for message in state_messages or []:
+        message_id = getattr(message, "id", None)
+        cached = _normalized_cache.get(message_id) if message_id is not None else _MISSING
+        if cached is not _MISSING and cached[0] == message.content:
+            normalized = cached[1]
+        else:
+            normalized = _normalize_message(message)
+            if message_id is not None:
+                _normalized_cache.set(message_id, (message.content, normalized), NORMALIZED_CACHE_TTL)
+        if normalized is not None:
+            normalized_history.append(normalized)
 
     if not normalized_history:
         logger.warning(
@@ -527,7 +980,19 @@ def prepare_supervisor_messages(system_prompt: str, state_messages: List[Any]) -
             )
         )
 
-    return [SystemMessage(content=system_prompt), *normalized_history]
+    return normalized_history
+
+
+def _normalize_message(message: Any):
+    """Plain-text copy of a message, or None if it has no usable text."""
+    if not isinstance(message, BaseMessage):
+        message = convert_to_messages([message])[0]
+    content_text = _coerce_message_content_to_text(message.content)
+    if not content_text:
+        return None
+    if content_text == message.content:
+        return message
+    return message.model_copy(update={"content": content_text})
 
 
 def _coerce_message_content_to_text(content: Any) -> str:
@@ -560,54 +1025,69 @@ def _coerce_message_content_to_text(content: Any) -> str:
         return ""
     return str(content).strip()
 
+FINAL_SUMMARY_SECTION = "Final Summary"
+
 def extract_final_summary(notes_file=None):
+    """Return the summarizer's "Final Summary" section formatted as the research summary.
+
+    The section is looked up by name in the notes store's section index and read
+    directly, so the rest of the document is never parsed. The run is finishing, so the
+    store's markdown file (where its backend keeps one) is written out first and the
+    session is closed.
+
+    Passing notes_file reads the section from that rendered markdown file instead of the
+    session store.
+    """
     try:
         if notes_file is None:
-            notes_file = get_or_create_notes_file()
-            
-        with open(notes_file, "r") as f:
-            content = f.read()
-
-        lines = content.split("\n")
-        final_summary = []
-        in_final_summary = False
-        final_summary_level = 0 
-        
-        for line in lines:
-            if not in_final_summary and any(header in line.lower() for header in ["# final summary", "## final summary", "final summary"]):
-                in_final_summary = True
-                final_summary_level = line.count('#') if '#' in line else 2  
-                final_summary.append("# Tech Research Summary\n")
-                continue
-                
-            elif in_final_summary and line.strip().startswith('#'):
-                current_level = line.count('#')
-                if current_level <= final_summary_level and "final summary" not in line.lower():
-                    in_final_summary = False
-                    continue
-            
-            if in_final_summary:
-                final_summary.append(line)
-        
-        formatted_summary = "\n".join(final_summary)
-        
-        if not formatted_summary.strip():
+            store = get_notes_store()
+            store.materialize()
+            section = store.find_section(FINAL_SUMMARY_SECTION)
+            content = store.read_section(section) if section is not None else None
+            # The run is over: its document is on disk (or, in memory, no longer needed)
+            close_session()
+        else:
+            with open(notes_file, "r") as f:
+                content = markdown_section(f.read(), FINAL_SUMMARY_SECTION)
+
+        if not content or not content.strip():
             print("No 'Final Summary' section found in the exact format expected.")
             return "No final summary found. Please check if the summarizer agent correctly created a 'Final Summary' section."
             
-        return formatted_summary
+        return f"# Tech Research Summary\n\n{content.strip()}\n"
         
     except Exception as e:
         return f"Error retrieving final summary: {str(e)}"
 
+def markdown_section(content, title):
+    """Body of the first markdown section whose heading is exactly title (case-insensitive).
+
+    The section ends at the next heading of the same or a higher level.
+    """
+    wanted = section_key(title)
+    lines = []
+    level = None
+    for line in content.split("\n"):
+        stripped = line.strip()
+        heading_level = len(stripped) - len(stripped.lstrip("#")) if stripped.startswith("#") else 0
+        if level is None:
+            if heading_level and section_key(stripped) == wanted:
+                level = heading_level
+            continue
+        if heading_level and heading_level <= level:
+            break
+        lines.append(line)
+    return "\n".join(lines) if level is not None else None
+
 def optimize_agent_state(state: MultiAgentState):
-    """Create an optimized state that includes only the original user message and the latest supervisor message."""
-    original_message = state["messages"][0] if state["messages"] else None
-    supervisor_messages = [
-        msg for msg in state["messages"] 
-        if msg.type == "human" and "SUPERVISOR" in str(msg.content)
-    ]
-    latest_supervisor = supervisor_messages[-1] if supervisor_messages else None
+    """Create an optimized state that includes only the run's user message and the latest supervisor message."""
+    original_message = run_request_message(state["messages"]) or (state["messages"][0] if state["messages"] else None)
+    # Scan from the end: the latest instruction is near the tail of a long history
+    latest_supervisor = next(
+        (msg for msg in reversed(state["messages"])
+         if msg.type == "human" and "SUPERVISOR" in str(msg.content)),
+        None
+    )
     filtered_messages = []
     if original_message:
         filtered_messages.append(original_message)
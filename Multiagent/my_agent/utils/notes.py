@@ -0,0 +1,476 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from langgraph.config import get_config
+from my_agent.utils.llm_cache import get_llm_cache
+
+# -------------------- Configuration --------------------
+
+NOTES_BACKEND = os.environ.get("NOTES_BACKEND", "file")  # file, sqlite or memory
+NOTES_DIR = os.environ.get("NOTES_DIR", "notes")
+NOTES_DB_PATH = os.environ.get("NOTES_DB_PATH", os.path.join(NOTES_DIR, "research_notes.sqlite"))
+# Print the full notes document after every write (debugging aid, off by default)
+ECHO_NOTES = os.environ.get("NOTES_ECHO", "").lower() in ("1", "true", "yes")
+# Open notes sessions kept in memory; evicted sessions are reopened from storage
+MAX_OPEN_SESSIONS = int(os.environ.get("NOTES_MAX_OPEN_SESSIONS", "256"))
+# Sources kept per keyword when notes are read as a digest
+DIGEST_SOURCES_PER_KEYWORD = int(os.environ.get("NOTES_DIGEST_SOURCES", "3"))
+# Rough characters-per-token ratio used to turn a token budget into a character budget
+CHARS_PER_TOKEN = 4
+
+DEFAULT_SESSION = "default"
+
+logger = logging.getLogger(__name__)
+
+# -------------------- Notes store interface --------------------
+
+class NotesStore(ABC):
+    """A session's research notes document, organised by section.
+
+    Subclasses provide the storage: appending content to a section, listing sections
+    and bulk-reading sections. Rendering the markdown view is shared.
+    """
+
+    path = None  # markdown file backing the document, if any
+
+    def __init__(self, title=None):
+        self.title = title
+        self._lock = threading.Lock()
+        self._rendered = None
+        self._version = 0
+
+    @abstractmethod
+    def _append(self, section, content):
+        """Persist content at the end of a section."""
+
+    @abstractmethod
+    def sections(self):
+        """Section names in the order they were first written."""
+
+    @abstractmethod
+    def read_sections(self, sections=None):
+        """Return {section: content} for the requested sections (all when None), in document order.
+
+        Sections that do not exist are left out.
+        """
+
+    def append(self, section, content):
+        """Append content to a section, creating the section if needed."""
+        with self._lock:
+            self._append(section, content)
+            self._rendered = None
+            self._version += 1
+
+    def read_section(self, section):
+        """Return a section's content, or None if the section does not exist."""
+        return self.read_sections([section]).get(section)
+
+    def find_section(self, name):
+        """The stored section whose name matches name ignoring case, spacing and leading '#'s."""
+        wanted = section_key(name)
+        for section in self.sections():
+            if section_key(section) == wanted:
+                return section
+        return None
+
+    def render(self):
+        """Markdown view of the whole document, rendered lazily and cached until the next write."""
+        with self._lock:
+            if self._rendered is not None:
+                return self._rendered
+            version = self._version
+        rendered = render_document(self.title, self.read_sections())
+        with self._lock:
+            if self._version == version:
+                self._rendered = rendered
+        return rendered
+
+    def materialize(self):
+        """Return the markdown view, writing it out first where the backend keeps a file."""
+        return self.render()
+
+def section_key(name):
+    return " ".join(name.lstrip("#").split()).lower()
+
+def render_document(title, contents):
+    """Markdown for a title and an ordered {section: content} mapping."""
+    parts = [f"# {title}\n\n" if title else ""]
+    for section, content in contents.items():
+        parts.append(f"\n## {section}\n\n{content}")
+    return "".join(parts)
+
+# -------------------- File backend --------------------
+
+class FileNotesStore(NotesStore):
+    """Notes kept as an append-only segment log plus an in-memory section index.
+
+    Each write appends one JSON record to ``<path>.log`` and records its byte offset under
+    its section, so appending to a section is O(1) whatever the document size. The markdown
+    document at ``path`` is a view that is only written when the notes are read.
+    """
+
+    def __init__(self, path, title=None):
+        super().__init__(title)
+        self.path = path
+        self.log_path = f"{path}.log"
+        self._index = {}  # section -> [(offset, length), ...] in write order
+        self._materialized_version = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.log_path):
+            self._load_index()
+        else:
+            self._append_record({"title": title or ""})
+
+    def _load_index(self):
+        """Rebuild the section index by scanning an existing log once."""
+        offset = 0
+        with open(self.log_path, "rb") as f:
+            for line in f:
+                record = json.loads(line)
+                if "title" in record:
+                    self.title = record["title"]
+                else:
+                    self._index.setdefault(record["section"], []).append((offset, len(line)))
+                offset += len(line)
+
+    def _append_record(self, record):
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        with open(self.log_path, "ab") as f:
+            offset = f.tell()
+            f.write(line)
+        return offset, len(line)
+
+    def _append(self, section, content):
+        position = self._append_record({"section": section, "content": content})
+        self._index.setdefault(section, []).append(position)
+
+    def sections(self):
+        with self._lock:
+            return list(self._index)
+
+    def read_sections(self, sections=None):
+        wanted = None if sections is None else set(sections)
+        with self._lock:
+            positions = {
+                section: list(offsets)
+                for section, offsets in self._index.items()
+                if wanted is None or section in wanted
+            }
+        results = {}
+        if not positions:
+            return results
+        with open(self.log_path, "rb") as f:
+            for section, offsets in positions.items():
+                parts = []
+                for offset, length in offsets:
+                    f.seek(offset)
+                    parts.append(json.loads(f.read(length))["content"])
+                results[section] = "".join(parts)
+        return results
+
+    def materialize(self):
+        """Write the markdown view to ``path`` if it changed since the last call, and return it."""
+        version = self._version
+        rendered = self.render()
+        if self._materialized_version != version:
+            with open(self.path, "w") as f:
+                f.write(rendered)
+            self._materialized_version = version
+        return rendered
+
+# -------------------- SQLite backend --------------------
+
+_connections = {}
+_connections_lock = threading.Lock()
+
+def sqlite_connection(db_path):
+    """One shared WAL-mode connection (and its lock) per database file and process."""
+    with _connections_lock:
+        entry = _connections.get(db_path)
+        if entry is None:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS notes_sessions ("
+                "session_id TEXT PRIMARY KEY, title TEXT, created_at TEXT NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS notes_entries ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, "
+                "section TEXT NOT NULL, content TEXT NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS notes_entries_section "
+                "ON notes_entries (session_id, section, id)"
+            )
+            entry = (conn, threading.Lock())
+            _connections[db_path] = entry
+        return entry
+
+
+class SqliteNotesStore(NotesStore):
+    """Notes stored as rows in a shared SQLite database (WAL mode), indexed by session and section.
+
+    Many runs and processes on one machine can share the database safely.
+    """
+
+    def __init__(self, db_path, session_id, title=None):
+        super().__init__(title)
+        self.db_path = db_path
+        self.session_id = session_id
+        self._conn, self._db_lock = sqlite_connection(db_path)
+        with self._db_lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO notes_sessions (session_id, title, created_at) VALUES (?, ?, ?)",
+                (session_id, title, datetime.now().isoformat())
+            )
+            row = self._conn.execute(
+                "SELECT title FROM notes_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        self.title = row[0]
+
+    def _append(self, section, content):
+        with self._db_lock:
+            self._conn.execute(
+                "INSERT INTO notes_entries (session_id, section, content) VALUES (?, ?, ?)",
+                (self.session_id, section, content)
+            )
+
+    def sections(self):
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT section FROM notes_entries WHERE session_id = ? GROUP BY section ORDER BY MIN(id)",
+                (self.session_id,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def read_sections(self, sections=None):
+        query = "SELECT section, content FROM notes_entries WHERE session_id = ?"
+        params = [self.session_id]
+        if sections is not None:
+            sections = list(sections)
+            if not sections:
+                return {}
+            query += f" AND section IN ({', '.join('?' for _ in sections)})"
+            params.extend(sections)
+        with self._db_lock:
+            rows = self._conn.execute(query + " ORDER BY id", params).fetchall()
+        parts = {}
+        for section, content in rows:
+            parts.setdefault(section, []).append(content)
+        return {section: "".join(contents) for section, contents in parts.items()}
+
+# -------------------- In-memory backend --------------------
+
+class MemoryNotesStore(NotesStore):
+    """Notes held only in process memory; useful for tests and throwaway runs."""
+
+    def __init__(self, title=None):
+        super().__init__(title)
+        self._sections = {}
+
+    def _append(self, section, content):
+        self._sections.setdefault(section, []).append(content)
+
+    def sections(self):
+        with self._lock:
+            return list(self._sections)
+
+    def read_sections(self, sections=None):
+        with self._lock:
+            return {
+                section: "".join(contents)
+                for section, contents in self._sections.items()
+                if sections is None or section in sections
+            }
+
+# -------------------- Digests and budgets --------------------
+# Reading the whole document is the largest input the editing team sends to the LLM, so
+# readers can ask for a digest (sources trimmed per keyword) and a character budget.
+
+HEADING = re.compile(r"^#+\s")
+SOURCE_ITEM = re.compile(r"^\d+\.\s")
+
+def digest_section(content, sources_per_keyword=None):
+    """Keep only the first sources_per_keyword numbered source items under each heading.
+
+    The report tools write numbered source items, each with indented detail lines, under a
+    heading per keyword ("### keyword" in trend reports, "## Sources for 'keyword'" in
+    search results). The count restarts at every heading and each block that lost items
+    gets one note saying how many. Everything else is kept as is.
+    """
+    if sources_per_keyword is None:
+        sources_per_keyword = DIGEST_SOURCES_PER_KEYWORD
+    kept = []
+    seen = dropped = 0
+    skipping = False
+
+    def flush_dropped():
+        nonlocal dropped
+        if dropped:
+            separator = "" if kept and not kept[-1].strip() else "\n"
+            kept.append(f"{separator}   _({dropped} more sources omitted)_\n\n")
+            dropped = 0
+
+    for line in content.splitlines(keepends=True):
+        if HEADING.match(line):
+            flush_dropped()
+            seen = 0
+            skipping = False
+        elif SOURCE_ITEM.match(line):
+            seen += 1
+            skipping = seen > sources_per_keyword
+            if skipping:
+                dropped += 1
+        elif skipping and line.strip() and not line.startswith((" ", "\t")):
+            flush_dropped()
+            skipping = False
+        if not skipping:
+            kept.append(line)
+    flush_dropped()
+    return "".join(kept)
+
+def truncate_text(text, max_chars):
+    """Cut text to at most max_chars at a line boundary, noting how much was dropped."""
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind("\n", 0, max_chars)
+    cut = cut + 1 if cut > 0 else max_chars
+    return f"{text[:cut]}\n_[truncated {len(text) - cut} characters]_\n\n"
+
+def fit_to_budget(contents, max_chars):
+    """Truncate sections so their total length fits in max_chars.
+
+    Short sections are kept whole; the remaining budget is shared equally between the
+    sections that do not fit, so one long report cannot crowd out the others.
+    """
+    remaining = max_chars
+    pending = sorted(contents, key=lambda section: len(contents[section]))
+    limits = {}
+    while pending:
+        share = remaining // len(pending)
+        section = pending.pop(0)
+        limits[section] = min(len(contents[section]), share)
+        remaining -= limits[section]
+    return {section: truncate_text(content, limits[section]) for section, content in contents.items()}
+
+def read_document(store, sections=None, max_chars=None, max_tokens=None, digest=False, sources_per_keyword=None):
+    """Render a store's notes, optionally restricted to sections, digested and fitted to a budget."""
+    if sections is None and max_chars is None and max_tokens is None and not digest:
+        return store.materialize()
+
+    contents = store.read_sections(sections)
+    if digest:
+        contents = {section: digest_section(content, sources_per_keyword) for section, content in contents.items()}
+    if max_tokens is not None:
+        token_chars = max_tokens * CHARS_PER_TOKEN
+        max_chars = token_chars if max_chars is None else min(max_chars, token_chars)
+    if max_chars is not None:
+        overhead = len(render_document(store.title, dict.fromkeys(contents, "")))
+        contents = fit_to_budget(contents, max(0, max_chars - overhead))
+    return render_document(store.title, contents)
+
+# -------------------- Sessions --------------------
+# Every run gets its own document: nodes scope the notes tools to a session made of the
+# LangGraph thread and the run's user message (notes_session), so a second run on the same
+# thread, or concurrent runs in one process, never share a document. Calls outside a
+# scoped node fall back to the thread (or the default session).
+
+_sessions = OrderedDict()
+_sessions_lock = threading.Lock()
+_scoped_session = ContextVar("notes_session", default=None)
+
+def thread_session_id():
+    """The thread_id of the LangGraph run we are executing in, or the default session."""
+    try:
+        config = get_config()
+    except RuntimeError:
+        return DEFAULT_SESSION
+    thread_id = (config.get("configurable") or {}).get("thread_id")
+    return str(thread_id) if thread_id else DEFAULT_SESSION
+
+def run_session_id(run_key):
+    """The session of one run on the current thread, run_key identifying the run (e.g. its request's ID)."""
+    thread = thread_session_id()
+    return f"{thread}-{run_key}" if run_key else thread
+
+def current_session_id():
+    """The session the notes tools use here: the enclosing notes_session, else the thread's."""
+    return _scoped_session.get() or thread_session_id()
+
+@contextmanager
+def notes_session(session_id):
+    """Scope the notes tools to session_id in this block and the tools and agents it calls."""
+    token = _scoped_session.set(session_id)
+    try:
+        yield
+    finally:
+        _scoped_session.reset(token)
+
+def session_notes_path(session_id):
+    if session_id == DEFAULT_SESSION:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        unique_id = str(uuid.uuid4())[:8]
+        filename = f"research_notes_{timestamp}_{unique_id}.md"
+    else:
+        filename = f"research_notes_{re.sub(r'[^A-Za-z0-9_.-]', '_', session_id)}.md"
+    return os.path.join(NOTES_DIR, filename)
+
+def create_store(session_id, backend=None):
+    """Create the notes store for a session with the configured backend."""
+    backend = backend or NOTES_BACKEND
+    title = "Research Notes"
+    # The title is part of every read_notes result: with the LLM response cache on, a
+    # timestamp would keep fact-checker and summarizer prompts from ever matching a past run
+    if get_llm_cache() is None:
+        title = f"{title} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+    if backend == "file":
+        return FileNotesStore(session_notes_path(session_id), title=title)
+    if backend == "sqlite":
+        return SqliteNotesStore(NOTES_DB_PATH, session_id, title=title)
+    if backend == "memory":
+        return MemoryNotesStore(title=title)
+    raise ValueError(f"Unknown notes backend '{backend}'. Please use one of: file, sqlite, memory")
+
+def get_session_store(session_id=None):
+    """Get the notes store for a session (the current run's thread by default), creating it if needed."""
+    if session_id is None:
+        session_id = current_session_id()
+    with _sessions_lock:
+        store = _sessions.get(session_id)
+        if store is not None:
+            _sessions.move_to_end(session_id)
+            return store
+
+        store = create_store(session_id)
+        _sessions[session_id] = store
+        # Least recently used first; runs close their session when they finish, so this only
+        # drops runs that never did (in-memory notes are lost, persistent ones can be reopened)
+        while len(_sessions) > MAX_OPEN_SESSIONS:
+            _sessions.popitem(last=False)
+
+    logger.debug("Opened notes session '%s' (%s)", session_id, type(store).__name__)
+    return store
+
+def close_session(session_id=None):
+    """Forget a session (the current one by default); persistent backends keep its notes."""
+    if session_id is None:
+        session_id = current_session_id()
+    with _sessions_lock:
+        _sessions.pop(session_id, None)
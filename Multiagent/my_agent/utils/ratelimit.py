@@ -0,0 +1,114 @@
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: the file backend falls back to in-process buckets
+    fcntl = None
+
+# -------------------- Configuration --------------------
+
+RATE_LIMIT_BACKEND = os.environ.get("SAFRON_RATE_LIMIT_BACKEND", "memory")  # memory or file
+RATE_LIMIT_DIR = os.environ.get("SAFRON_RATE_LIMIT_DIR", os.path.join("cache", "ratelimit"))
+
+# Requests per second and burst size per endpoint. A rate of 0 disables limiting.
+RATE_LIMITS = {
+    "keywords": {"rate": float(os.environ.get("SAFRON_RATE_KEYWORDS", "10")), "burst": 10},
+    "sources": {"rate": float(os.environ.get("SAFRON_RATE_SOURCES", "10")), "burst": 10},
+    "ai-summary": {"rate": float(os.environ.get("SAFRON_RATE_AI_SUMMARY", "4")), "burst": 4},
+}
+DEFAULT_RATE_LIMIT = {"rate": 10.0, "burst": 10}
+
+# -------------------- Buckets --------------------
+
+class TokenBucket:
+    """Thread-safe token bucket shared by every thread in the process."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token and return how long the caller must wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class FileTokenBucket:
+    """Token bucket whose state lives in a lock-protected file, shared between processes."""
+
+    def __init__(self, rate, burst, path):
+        self.rate = rate
+        self.burst = burst
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def reserve(self):
+        with self._lock, open(self.path, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                now = time.time()
+                try:
+                    tokens, updated = (float(value) for value in f.read().split())
+                except ValueError:
+                    tokens, updated = float(self.burst), now
+                tokens = min(self.burst, tokens + max(0.0, now - updated) * self.rate) - 1
+                f.seek(0)
+                f.truncate()
+                f.write(f"{tokens} {now}")
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        return 0.0 if tokens >= 0 else -tokens / self.rate
+
+# -------------------- Registry --------------------
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+def create_bucket(endpoint):
+    limits = RATE_LIMITS.get(endpoint, DEFAULT_RATE_LIMIT)
+    if limits["rate"] <= 0:
+        return None
+    if RATE_LIMIT_BACKEND == "file" and fcntl is not None:
+        path = os.path.join(RATE_LIMIT_DIR, f"{endpoint}.bucket")
+        return FileTokenBucket(limits["rate"], limits["burst"], path)
+    return TokenBucket(limits["rate"], limits["burst"])
+
+def get_bucket(endpoint):
+    with _buckets_lock:
+        if endpoint not in _buckets:
+            _buckets[endpoint] = create_bucket(endpoint)
+        return _buckets[endpoint]
+
+def configure_rate_limit(endpoint, rate, burst=None):
+    """Set the rate (requests per second) and burst for an endpoint; rate 0 disables it."""
+    with _buckets_lock:
+        RATE_LIMITS[endpoint] = {"rate": rate, "burst": burst or max(1, int(rate))}
+        _buckets.pop(endpoint, None)
+
+def acquire(endpoint):
+    """Block the calling thread until the endpoint's bucket allows another request.
+
+    Async tools send their requests from the API worker pool, so they wait here too:
+    the token is taken when a request is actually sent, after the response cache and
+    request coalescing have had their chance to answer it.
+    """
+    bucket = get_bucket(endpoint)
+    if bucket is None:
+        return
+    wait = bucket.reserve()
+    if wait > 0:
+        time.sleep(wait)
@@ -0,0 +1,229 @@
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# -------------------- Configuration --------------------
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Per-endpoint retry settings. ai-summary is the slowest and most expensive endpoint,
+# so it gets fewer attempts and a longer base delay.
+RETRY_POLICIES = {
+    "keywords": {"max_attempts": 3, "base_delay": 0.5, "max_delay": 8.0},
+    "sources": {"max_attempts": 3, "base_delay": 0.5, "max_delay": 8.0},
+    "ai-summary": {"max_attempts": 2, "base_delay": 1.0, "max_delay": 15.0},
+}
+DEFAULT_RETRY_POLICY = {"max_attempts": 3, "base_delay": 0.5, "max_delay": 8.0}
+
+# Retries allowed per request (e.g. 0.2 = at most one retry for every five requests),
+# plus a small floor so a quiet endpoint can still retry.
+RETRY_BUDGET_RATIO = float(os.environ.get("SAFRON_RETRY_BUDGET_RATIO", "0.2"))
+RETRY_BUDGET_MIN = float(os.environ.get("SAFRON_RETRY_BUDGET_MIN", "10"))
+
+# Longest Retry-After we are willing to wait in-line before giving up
+MAX_RETRY_AFTER = float(os.environ.get("SAFRON_MAX_RETRY_AFTER", "30"))
+
+BREAKER_FAILURE_THRESHOLD = int(os.environ.get("SAFRON_BREAKER_FAILURES", "5"))
+BREAKER_COOLDOWN = float(os.environ.get("SAFRON_BREAKER_COOLDOWN", "30"))
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the endpoint's circuit breaker is open."""
+
+# -------------------- Retry budget --------------------
+
+class RetryBudget:
+    """Token bucket that caps retries to a fraction of the endpoint's request volume."""
+
+    def __init__(self, ratio=None, minimum=None):
+        ratio = RETRY_BUDGET_RATIO if ratio is None else ratio
+        minimum = RETRY_BUDGET_MIN if minimum is None else minimum
+        self.ratio = ratio
+        self.capacity = minimum + 100 * ratio
+        self._tokens = minimum
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + self.ratio)
+
+    def withdraw(self):
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+# -------------------- Circuit breaker --------------------
+
+class CircuitBreaker:
+    """Opens after consecutive failed requests and fails fast until the cool-down has elapsed.
+
+    After the cool-down a single trial call is let through (half-open); its outcome
+    closes the breaker again or restarts the cool-down.
+    """
+
+    def __init__(self, failure_threshold=None, cooldown=None):
+        self.failure_threshold = BREAKER_FAILURE_THRESHOLD if failure_threshold is None else failure_threshold
+        self.cooldown = BREAKER_COOLDOWN if cooldown is None else cooldown
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.cooldown:
+                self.state = "half-open"
+            if self.state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self.state == "half-open" or self._failures >= self.failure_threshold:
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+    def retry_in(self):
+        """Seconds until the breaker lets a trial call through."""
+        with self._lock:
+            if self.state != "open":
+                return 0.0
+            return max(0.0, self.cooldown - (time.monotonic() - self._opened_at))
+
+# -------------------- Endpoint state and metrics --------------------
+
+_endpoints = {}
+_endpoints_lock = threading.Lock()
+
+def endpoint_state(endpoint):
+    with _endpoints_lock:
+        state = _endpoints.get(endpoint)
+        if state is None:
+            state = {
+                "policy": RETRY_POLICIES.get(endpoint, DEFAULT_RETRY_POLICY),
+                "budget": RetryBudget(),
+                "breaker": CircuitBreaker(),
+                "metrics": {"requests": 0, "attempts": 0, "retries": 0, "failures": 0,
+                            "short_circuited": 0, "budget_exhausted": 0},
+                "lock": threading.Lock(),
+            }
+            _endpoints[endpoint] = state
+        return state
+
+def _count(state, metric):
+    with state["lock"]:
+        state["metrics"][metric] += 1
+
+def resilience_metrics():
+    """Request, retry and failure counters plus breaker state for each endpoint."""
+    with _endpoints_lock:
+        endpoints = dict(_endpoints)
+    metrics = {}
+    for endpoint, state in endpoints.items():
+        with state["lock"]:
+            metrics[endpoint] = dict(state["metrics"], breaker=state["breaker"].state)
+    return metrics
+
+def reset_resilience():
+    """Forget all breaker, budget and metric state."""
+    with _endpoints_lock:
+        _endpoints.clear()
+
+# -------------------- Retry loop --------------------
+
+def retry_after_seconds(response):
+    """Parse a Retry-After header given either as seconds or as an HTTP date."""
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt, policy):
+    """Full-jitter exponential backoff for the given (1-based) attempt."""
+    ceiling = min(policy["max_delay"], policy["base_delay"] * (2 ** (attempt - 1)))
+    return random.uniform(0, ceiling)
+
+def call_with_resilience(endpoint, send):
+    """Call send() with retries, backoff and the endpoint's circuit breaker.
+
+    send is a zero-argument callable returning a response. Retryable status codes and
+    exceptions are retried while attempts and the retry budget allow; the last response
+    is returned, or the last exception re-raised. Raises CircuitOpenError without calling
+    send when the breaker is open.
+
+    The breaker is consulted once per request, so a half-open trial keeps its retries,
+    and every way out of the request records its outcome on the breaker.
+    """
+    state = endpoint_state(endpoint)
+    policy, budget, breaker = state["policy"], state["budget"], state["breaker"]
+
+    _count(state, "requests")
+    budget.deposit()
+
+    if not breaker.allow():
+        _count(state, "short_circuited")
+        raise CircuitOpenError(
+            f"circuit open for '{endpoint}', retrying in {breaker.retry_in():.0f}s"
+        )
+
+    succeeded = False
+    try:
+        attempt = 0
+        while True:
+            attempt += 1
+            _count(state, "attempts")
+            response, error = None, None
+            try:
+                response = send()
+            except Exception as e:
+                error = e
+
+            if error is None and response.status_code not in RETRYABLE_STATUS_CODES:
+                succeeded = True
+                return response
+
+            delay = retry_after_seconds(response)
+            if delay is None:
+                delay = backoff_delay(attempt, policy)
+
+            if attempt >= policy["max_attempts"] or delay > MAX_RETRY_AFTER:
+                break
+            if not budget.withdraw():
+                _count(state, "budget_exhausted")
+                break
+
+            _count(state, "retries")
+            time.sleep(delay)
+
+        _count(state, "failures")
+        if error is not None:
+            raise error
+        return response
+    finally:
+        if succeeded:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
@@ -0,0 +1,138 @@
+import os
+import re
+import threading
+
+# -------------------- Configuration --------------------
+# Supervisors normally ask the LLM for every hop. In "rules" mode they first follow a
+# declarative plan, reading progress from the [COMPLETED ...] markers in the history,
+# and only ask the LLM when the history does not match the plan.
+
+ROUTING_MODE = os.environ.get("SUPERVISOR_ROUTING", "llm")  # llm or rules
+# In "parallel" mode teams that support it dispatch all their workers at once with Send
+RESEARCH_MODE = os.environ.get("RESEARCH_MODE", "sequential")  # sequential or parallel
+
+COMPLETED_MARKER = re.compile(r"^\[COMPLETED ([^\]]+)\]")
+TEAM_COMPLETED_MARKER = re.compile(r"^Research complete\. Response from the (\w+) team supervisor")
+
+def plan_step(next, instruction, done=None):
+    """One plan step: route to next with instruction ({request} is the user's request).
+
+    done is the label the worker reports when it finishes (its [COMPLETED ...] name, or
+    the team name for teams), if it differs from next.
+    """
+    return {"next": next, "instruction": instruction, "done": done or next}
+
+def rules_enabled():
+    return ROUTING_MODE == "rules"
+
+def parallel_enabled():
+    return RESEARCH_MODE == "parallel"
+
+# -------------------- Progress --------------------
+
+def message_text(message):
+    content = message.content
+    return content if isinstance(content, str) else str(content)
+
+def team_progress(messages, team):
+    """Workers that completed since the team was last delegated to, or None if that is unclear.
+
+    Scans back to the latest main supervisor instruction. Every team instruction must have
+    been answered by exactly one [COMPLETED ...] message with a usable result.
+    """
+    completed = []
+    instructions = 0
+    instruction_prefix = f"[INSTRUCTION FROM {team} TEAM SUPERVISOR]"
+    for message in reversed(messages):
+        text = message_text(message)
+        if text.startswith("[INSTRUCTION FROM MAIN SUPERVISOR]"):
+            break
+        if text.startswith(instruction_prefix):
+            instructions += 1
+            continue
+        match = COMPLETED_MARKER.match(text)
+        if match:
+            if text[match.end():].strip() in ("", "No valid results."):
+                return None
+            completed.append(match.group(1))
+    else:
+        return None
+    return completed[::-1] if instructions == len(completed) else None
+
+def main_progress(messages):
+    """Teams that reported back to the main supervisor, in order, or None if that is unclear."""
+    completed = []
+    instructions = 0
+    for message in messages:
+        text = message_text(message)
+        if text.startswith("[INSTRUCTION FROM MAIN SUPERVISOR]"):
+            instructions += 1
+            continue
+        match = TEAM_COMPLETED_MARKER.match(text)
+        if match:
+            completed.append(match.group(1))
+    return completed if instructions == len(completed) else None
+
+# -------------------- Parallel dispatch --------------------
+
+PARALLEL_DISPATCH = "Dispatched in parallel: "
+
+def dispatch_text(team, tasks):
+    """The team instruction recording a parallel dispatch of tasks ({"next", "instruction"} dicts)."""
+    lines = [f"[INSTRUCTION FROM {team} TEAM SUPERVISOR]", PARALLEL_DISPATCH + ", ".join(task["next"] for task in tasks)]
+    lines.extend(f"- {task['next']}: {task['instruction']}" for task in tasks)
+    return "\n".join(lines)
+
+def parallel_phase(messages, team):
+    """Where a parallel team stands since the latest main supervisor instruction.
+
+    "dispatch" when the team has not dispatched anything yet, "joined" when every worker of
+    the last parallel dispatch reported a usable result, and None otherwise (a worker failed,
+    or the team is routing one worker at a time).
+    """
+    completed = 0
+    failed = False
+    instruction_prefix = f"[INSTRUCTION FROM {team} TEAM SUPERVISOR]"
+    for message in reversed(messages):
+        text = message_text(message)
+        if text.startswith("[INSTRUCTION FROM MAIN SUPERVISOR]"):
+            return "dispatch" if completed == 0 else None
+        if text.startswith(instruction_prefix):
+            header = text[len(instruction_prefix):].lstrip("\n")
+            if not header.startswith(PARALLEL_DISPATCH):
+                return None
+            dispatched = header[len(PARALLEL_DISPATCH):].split("\n", 1)[0].split(", ")
+            return "joined" if completed == len(dispatched) and not failed else None
+        match = COMPLETED_MARKER.match(text)
+        if match:
+            completed += 1
+            failed = failed or text[match.end():].strip() in ("", "No valid results.")
+    return None
+
+# -------------------- Routing --------------------
+
+_stats = {"rules": 0, "llm": 0}
+_stats_lock = threading.Lock()
+
+def record_decision(kind):
+    with _stats_lock:
+        _stats[kind] += 1
+
+def routing_stats():
+    """How many hops were decided by the plan and how many fell back to the LLM."""
+    with _stats_lock:
+        return dict(_stats)
+
+def plan_route(plan, completed, request):
+    """Next step when completed matches the start of the plan, else None.
+
+    A plan ends with FINISH implicitly once every step has completed.
+    """
+    if completed is None or len(completed) > len(plan):
+        return None
+    if [step["done"] for step in plan[:len(completed)]] != completed:
+        return None
+    if len(completed) == len(plan):
+        return {"next": "FINISH", "instruction": "All planned steps are complete."}
+    step = plan[len(completed)]
+    return {"next": step["next"], "instruction": step["instruction"].format(request=request)}
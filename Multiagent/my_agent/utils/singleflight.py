@@ -0,0 +1,64 @@
+import functools
+import threading
+from concurrent.futures import Future
+from my_agent.utils.cache import call_arguments, request_key
+
+# -------------------- Single flight --------------------
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one upstream call."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "coalesced": 0}
+
+    def do(self, key, func, *args, **kwargs):
+        """Run func once per key at a time; concurrent callers wait for and share its result."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self._stats["calls"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+
+_flight = SingleFlight()
+
+def single_flight_stats():
+    """Counts of upstream calls made and of callers that shared an in-flight call."""
+    return _flight.stats()
+
+# -------------------- Decorators --------------------
+
+def single_flight(endpoint):
+    """Share one in-flight upstream call between concurrent identical requests."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = request_key(endpoint, call_arguments(func, args, kwargs))
+            return _flight.do(key, func, *args, **kwargs)
+        return wrapper
+    return decorator
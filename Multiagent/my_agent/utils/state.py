@@ -4,3 +4,5 @@ from langgraph.graph import MessagesState
 class MultiAgentState(MessagesState):
     """State for the hierarchical agent system."""
     next: str = ""  # Next agent to run
+    # Running summary of the messages older than the supervisors' context window
+    context_summary: dict
@@ -1,13 +1,30 @@
-import requests
 from langchain_core.tools import tool
+from langgraph.config import get_stream_writer
 from typing import List, Optional
+import asyncio
+import functools
 import os
-import uuid
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from my_agent.utils.http_client import api_get, api_post
+from my_agent.utils.cache import cached_response
+from my_agent.utils.singleflight import single_flight
+from my_agent.utils.futures import gather, then
+from my_agent.utils.notes import get_session_store, read_document, ECHO_NOTES
+
+# Upper bound on concurrent Safron API calls made by a single tool invocation
+MAX_WORKERS = int(os.environ.get("SAFRON_MAX_WORKERS", "8"))
+# Keywords per ai-summary request; 1 disables batching
+SUMMARY_BATCH_SIZE = int(os.environ.get("SAFRON_SUMMARY_BATCH_SIZE", "10"))
+# Seconds to stop sending batch requests after one fails (e.g. the API does not support them)
+SUMMARY_BATCH_COOLDOWN = float(os.environ.get("SAFRON_SUMMARY_BATCH_COOLDOWN", "600"))
 
 # -------------------- CORE API FUNCTIONS --------------------
 # -------------------- Keywords Data -------------------
 
+@cached_response("keywords")
+@single_flight("keywords")
 def fetch_keywords_data(period="daily", category=None, limit=3, sort="trending"):
     """Core function to fetch keyword data from the API."""
     
@@ -35,7 +52,7 @@ def fetch_keywords_data(period="daily", category=None, limit=3, sort="trending")
         params["category"] = category.lower()
     
     try:
-        response = requests.get("https://public.api.safron.io/v2/keywords", params=params)
+        response = api_get("/keywords", params=params)
         if response.status_code == 200:
             return True, response.json()
         else:
@@ -45,6 +62,8 @@ def fetch_keywords_data(period="daily", category=None, limit=3, sort="trending")
     
 # -------------------- Sources Data -------------------
 
+@cached_response("sources")
+@single_flight("sources")
 def fetch_sources_data(keyword, source=None, period="daily", limit=5, type=None):
     """Core function to fetch source data from the API."""
 
@@ -70,12 +89,7 @@ def fetch_sources_data(keyword, source=None, period="daily", limit=5, type=None)
         params["type"] = type
     
     try:
-        response = requests.post(
-            "https://public.api.safron.io/v2/sources", 
-            headers={"Content-Type": "application/json"}, 
-            json=payload, 
-            params=params
-        )
+        response = api_post("/sources", json=payload, params=params)
         
         if response.status_code == 200:
             return True, response.json()
@@ -86,10 +100,10 @@ def fetch_sources_data(keyword, source=None, period="daily", limit=5, type=None)
     
 # -------------------- AI Summaries (Keywords) -------------------
 
+@cached_response("ai-summary")
+@single_flight("ai-summary")
 def fetch_keyword_summary(keyword, period="daily"):
     """Fetch an AI-generated summary for a keyword."""
-    base_url = "https://public.api.safron.io/v2/ai-summary"
-    
     valid_periods = ['daily', 'weekly', 'monthly', 'quarterly']
     validation_dict = {
         "period": (period, valid_periods, True),
@@ -104,11 +118,7 @@ def fetch_keyword_summary(keyword, period="daily"):
         "period": period
     }
     try:
-        response = requests.post(
-            base_url,
-            headers={"Content-Type": "application/json"},
-            json=payload
-        )
+        response = api_post("/ai-summary", json=payload)
         
         if response.status_code == 200:
             return True, response.json()
@@ -117,84 +127,239 @@ def fetch_keyword_summary(keyword, period="daily"):
     except Exception as e:
         return False, f"Exception during API call: {str(e)}"
 
+@cached_response("ai-summary-batch")
+@single_flight("ai-summary-batch")
+def fetch_summary_batch(keywords, period="daily"):
+    """Fetch AI-generated summaries for several keywords in one request."""
+    valid_periods = ['daily', 'weekly', 'monthly', 'quarterly']
+    validation_dict = {
+        "period": (period, valid_periods, True),
+        "keywords": (keywords or None, None, True)
+    }
+    is_valid, error_message = validate_parameters(validation_dict)
+    if not is_valid:
+        return False, error_message
+
+    payload = {
+        "keywords": list(keywords),
+        "period": period
+    }
+    try:
+        response = api_post("/ai-summary", json=payload)
+
+        if response.status_code == 200:
+            summaries = parse_summary_batch(response.json(), keywords)
+            if summaries is None:
+                return False, "Error fetching summaries: unexpected batch response format"
+            return True, summaries
+        else:
+            return False, f"Error fetching summaries: {response.status_code} - {response.text}"
+    except Exception as e:
+        return False, f"Exception during API call: {str(e)}"
+
+_batch_unsupported_until = 0.0
+
+def summary_batching_enabled():
+    return time.monotonic() >= _batch_unsupported_until
+
+def fetch_batch_summaries(keywords, period="daily"):
+    """keyword -> summary response for the keywords a batch request returned.
+
+    Returns {} without a request for a single keyword or while batching is cooling down
+    after a failed batch; the caller fetches the missing keywords one by one.
+    """
+    global _batch_unsupported_until
+    keywords = list(keywords)
+    if len(keywords) == 1 or not summary_batching_enabled():
+        return {}
+
+    success, summaries = fetch_summary_batch(keywords, period=period)
+    if not success:
+        _batch_unsupported_until = time.monotonic() + SUMMARY_BATCH_COOLDOWN
+        return {}
+    return {keyword: (True, {"summary": summaries[keyword]}) for keyword in keywords if summaries.get(keyword)}
+
+def submit_keyword_summaries(executor, keywords, period="daily"):
+    """Future of keyword -> summary response: one batch request, then one request per
+    keyword it did not return, submitted in parallel once the batch is done."""
+    keywords = list(keywords)
+
+    def fetch_missing(summaries):
+        missing = [keyword for keyword in keywords if keyword not in summaries]
+        futures = [executor.submit(fetch_keyword_summary, keyword=keyword, period=period) for keyword in missing]
+        return then(gather(futures), lambda responses: {**summaries, **dict(zip(missing, responses))})
+
+    return then(executor.submit(fetch_batch_summaries, keywords, period=period), fetch_missing)
+
 # -------------------- Helper functions --------------------
 
+def parse_summary_batch(data, keywords):
+    """Map keyword -> summary from a batch ai-summary response, or None if unrecognized.
+
+    Accepts {"summaries": [{"keyword": ..., "summary": ...}]}, {"summaries": {keyword: summary}}
+    and, for a single keyword, the per-keyword {"summary": ...} shape.
+    """
+    if not isinstance(data, dict):
+        return None
+    summaries = data.get("summaries")
+    if isinstance(summaries, dict):
+        return {keyword: summary for keyword, summary in summaries.items() if isinstance(summary, str)}
+    if isinstance(summaries, list):
+        return {
+            item.get("keyword"): item.get("summary")
+            for item in summaries
+            if isinstance(item, dict) and item.get("keyword") and item.get("summary")
+        }
+    if len(keywords) == 1 and isinstance(data.get("summary"), str):
+        return {keywords[0]: data["summary"]}
+    return None
+
+def summary_batches(keywords, batch_size=None):
+    """Split keywords into chunks of at most batch_size."""
+    if batch_size is None:
+        batch_size = SUMMARY_BATCH_SIZE
+    batch_size = max(1, batch_size)
+    return [keywords[i:i + batch_size] for i in range(0, len(keywords), batch_size)]
+
 # -------------------- Formatting --------------------
+# Reports are built by appending fragments to a list and joining once, so formatting
+# stays linear in the size of the report.
+
+SOURCE_TITLE_LINE = "{}. **{}**\n".format
+SOURCE_PUBLISHED_LINE = "   - Published: {}\n".format
+SOURCE_DETAIL_LINES = "   - Engagement: {}\n   - Source: {}\n   - Type: {}\n   - Link: [{}]({})\n\n".format
+SOURCE_PLAIN_LINE = "{}. {}\n\n".format
+STATS_LINES = "**Statistics:**\n- Mentions: {}\n".format
+TREND_LINE = "- Trend: {} {}%\n".format
+STATS_TAIL_LINES = "- Engagement: {}\n- Sentiment: {}\n\n".format
+
+@functools.lru_cache(maxsize=4096)
+def format_published_date(published):
+    """Convert an ISO timestamp into a display date, or return it unchanged if it does not parse."""
+    try:
+        return datetime.fromisoformat(published.replace("Z", "+00:00")).strftime("%b %d, %Y")
+    except (AttributeError, TypeError, ValueError):
+        return published
 
 def format_source_items(sources, standalone=False):
     """Format a list of source items consistently."""
-    formatted_text = ""
-    
     if not sources:
         return "No sources available."
-    
+
+    parts = []
+    write_source_items(parts, sources)
+    return "".join(parts)
+
+def write_source_items(parts, sources):
+    """Append the formatted source items to parts."""
+    append = parts.append
     for idx, source in enumerate(sources, 1):
         if not isinstance(source, dict):
-            formatted_text += f"{idx}. {source}\n\n"
+            append(SOURCE_PLAIN_LINE(idx, source))
             continue
-            
-        title = source.get('text', source.get('title', 'No title'))
-        
-        published = source.get("published", "")
+
+        get = source.get
+        append(SOURCE_TITLE_LINE(idx, get('text', get('title', 'No title'))))
+
+        published = get("published", "")
         if published:
             try:
-                from datetime import datetime
-                date_obj = datetime.fromisoformat(published.replace("Z", "+00:00"))
-                published = date_obj.strftime("%b %d, %Y")
-            except:
+                published = format_published_date(published)
+            except TypeError:  # unhashable value, leave it as is
                 pass
-        
-        formatted_text += f"{idx}. **{title}**\n"
-        if published:
-            formatted_text += f"   - Published: {published}\n"
-        formatted_text += f"   - Engagement: {source.get('engagement', 'Unknown')}\n"
-        formatted_text += f"   - Source: {source.get('source', 'Unknown')}\n"
-        formatted_text += f"   - Type: {source.get('type', 'Unknown type')}\n"
-        
-        link = source.get('link', source.get('url', '#'))
-        source_name = source.get('source', 'Link')
-        formatted_text += f"   - Link: [{source_name}]({link})\n\n"
-    
-    return formatted_text
+            append(SOURCE_PUBLISHED_LINE(published))
+
+        source_name = get('source')
+        append(SOURCE_DETAIL_LINES(
+            get('engagement', 'Unknown'),
+            source_name if 'source' in source else 'Unknown',
+            get('type', 'Unknown type'),
+            source_name if 'source' in source else 'Link',
+            get('link', get('url', '#'))
+        ))
 
 def format_enhanced_report(all_results, report_title, category_suffix):
     """Format report with enhanced data including statistics and summaries."""
-    formatted_response = f"# {report_title}\n\n"
+    parts = [format_report_title(report_title)]
     
     for category, keyword_data in all_results.items():
-        formatted_response += f"## {category.upper()} - {category_suffix}\n\n"
+        parts.append(format_category_heading(category, category_suffix))
         
         if not isinstance(keyword_data, dict):
-            formatted_response += f"{keyword_data}\n\n"
+            parts.append(f"{keyword_data}\n\n")
             continue
         
         for keyword, data in keyword_data.items():
-            stats = data.get("stats", {})
-            summary = data.get("summary", "No summary available")
-            sources = data.get("sources", [])
-            formatted_response += f"### {keyword}\n\n"
-            
-            if stats:
-                formatted_response += "**Statistics:**\n"
-                formatted_response += f"- Mentions: {stats.get('count', 'N/A')}\n"
-                if 'change_in_count' in stats:
-                    change = stats.get('change_in_count')
-                    direction = "↑" if change > 0 else "↓" if change < 0 else "→"
-                    formatted_response += f"- Trend: {direction} {abs(change)}%\n"
-                formatted_response += f"- Engagement: {stats.get('engagement', 'N/A')}\n"
-                formatted_response += f"- Sentiment: {stats.get('sentiment', 'N/A')}\n\n"
-            
-            if summary and summary != "No summary available":
-                formatted_response += "**Summary:**\n"
-                formatted_response += f"{summary}\n\n"
-            
-            formatted_response += "**Top Sources:**\n\n"
-            if isinstance(sources, list):
-                formatted_response += format_source_items(sources)
-            else:
-                formatted_response += f"Sources: {sources}\n\n"
+            write_keyword_block(parts, keyword, data)
     
-    return formatted_response
+    return "".join(parts)
+
+def stream_enhanced_report(events, report_title, category_suffix):
+    """Yield the same markdown as format_enhanced_report, one section at a time.
+
+    events are (category, keyword, data) tuples from iter_keywords_sources_data.
+    """
+    yield format_report_title(report_title)
+
+    for event in events:
+        yield from format_report_event(event, category_suffix)
+
+def format_report_event(event, category_suffix):
+    """Yield the markdown for a single (category, keyword, data) event."""
+    category, keyword, data = event
+    if keyword is not None:
+        yield format_keyword_block(keyword, data)
+    elif data is None:
+        yield format_category_heading(category, category_suffix)
+    elif isinstance(data, dict):
+        for error_key, error_data in data.items():
+            yield format_keyword_block(error_key, error_data)
+    else:
+        yield f"{data}\n\n"
+
+def format_report_title(report_title):
+    return f"# {report_title}\n\n"
+
+def format_category_heading(category, category_suffix):
+    return f"## {category.upper()} - {category_suffix}\n\n"
+
+def format_keyword_block(keyword, data):
+    """Format the statistics, summary and sources for one keyword."""
+    parts = []
+    write_keyword_block(parts, keyword, data)
+    return "".join(parts)
+
+def write_keyword_block(parts, keyword, data):
+    """Append the statistics, summary and sources for one keyword to parts."""
+    append = parts.append
+    append(f"### {keyword}\n\n")
+
+    if not isinstance(data, dict):
+        append(f"{data}\n\n")
+        return
+
+    stats = data.get("stats", {})
+    summary = data.get("summary", "No summary available")
+    sources = data.get("sources", [])
+    
+    if stats:
+        append(STATS_LINES(stats.get('count', 'N/A')))
+        if 'change_in_count' in stats:
+            change = stats.get('change_in_count')
+            direction = "↑" if change > 0 else "↓" if change < 0 else "→"
+            append(TREND_LINE(direction, abs(change)))
+        append(STATS_TAIL_LINES(stats.get('engagement', 'N/A'), stats.get('sentiment', 'N/A')))
+    
+    if summary and summary != "No summary available":
+        append(f"**Summary:**\n{summary}\n\n")
+    
+    append("**Top Sources:**\n\n")
+    if not isinstance(sources, list):
+        append(f"Sources: {sources}\n\n")
+    elif sources:
+        write_source_items(parts, sources)
+    else:
+        append("No sources available.")
 
 # -------------------- Validation --------------------
 
@@ -214,83 +379,201 @@ def validate_parameters(params_dict):
 
 # -------------------- Shared Implementation --------------------
 
-def get_keywords_sources_data(sort, categories=None, period="daily", limit=None):
+def get_keywords_sources_data(sort, categories=None, period="daily", limit=None, max_workers=None, batch_size=None):
+    """Fetch keywords, summaries and sources for each category concurrently."""
+    all_results = collect_keywords_sources_data(iter_keywords_sources_data(
+        sort,
+        categories=categories,
+        period=period,
+        limit=limit,
+        max_workers=max_workers,
+        batch_size=batch_size
+    ))
+    report_title, category_suffix = report_labels(sort)
+    
+    return all_results, report_title, category_suffix
+
+def iter_keywords_sources_data(sort, categories=None, period="daily", limit=None, max_workers=None, batch_size=None):
+    """Yield (category, keyword, data) events as each category and keyword becomes ready.
+
+    Category keyword lookups are issued in parallel. As soon as a category returns, its
+    keyword summaries are requested in batches and each keyword's sources lookup is
+    issued, all in parallel. Events are yielded in the category and keyword order of the
+    serial implementation:
+      (category, None, None)  - a category starts
+      (category, keyword, data) - a keyword's stats, summary and sources
+      (category, None, error) - the category failed (error string or {"Error": ...})
+    """
     if not categories:
-        categories = ['companies', 'subjects', 'people', 'websites'] if sort == "trending" else ['companies', 'subjects']
+        categories = default_categories(sort)
     
     if limit is None:
         limit = 3 if sort == "trending" else 2
+
+    if max_workers is None:
+        max_workers = MAX_WORKERS
     
-    all_results = {}
-    
-    for category in categories:
-        success, keywords_data = fetch_keywords_data(
-            period=period, 
-            category=category, 
-            limit=limit, 
-            sort=sort
-        )
-        
+    def submit_category(keywords_response):
+        success, keywords_data = keywords_response
         if not success:
-            all_results[category] = keywords_data  # Error message
-            continue
-            
-        keyword_results = {}
-        
+            return keywords_data  # Error message
+
         try:
-            for item in keywords_data.get("keywords", []):
-                keyword = item.get("keyword")
-                
-                if not keyword:
-                    continue
-                
-                stats = {
-                    "count": item.get("count"),
-                    "change_in_count": item.get("change_in_count"),
-                    "engagement": item.get("engagement"),
-                    "sentiment": item.get("sentiment")
-                }
-                
-                summary_success, summary_data = fetch_keyword_summary(keyword=keyword, period=period)
-                summary = summary_data.get("summary") if summary_success else "Summary not available"
-
-                sources_success, sources_data = fetch_sources_data(
-                    keyword=keyword, 
-                    period=period, 
-                    limit=3
-                )
-                
-                sources = []
-                if sources_success:
-                    try:
-                        for source in sources_data.get("articles", []):
-                            sources.append({
-                                "text": source.get("text"),
-                                "engagement": source.get("engagement"),
-                                "url": source.get("link"),
-                                "source": source.get("source"),
-                                "type": source.get("type")
-                            })
-                    except Exception as e:
-                        print(f"Error parsing sources: {e}")
-                        sources = [f"Error parsing sources: {str(e)}"]
-                else:
-                    sources = [sources_data]
-                
-                keyword_results[keyword] = {
-                    "stats": stats,
-                    "summary": summary,
-                    "sources": sources
-                }
+            items = [item for item in keywords_data.get("keywords", []) if item.get("keyword")]
+            return submit_keyword_fetches(executor, items, period, batch_size)
         except Exception as e:
-            keyword_results = {"Error": f"Failed to process keywords: {str(e)}"}
-        
-        all_results[category] = keyword_results
-    
+            return {"Error": f"Failed to process keywords: {str(e)}"}
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        # Each category's follow-up lookups are submitted from a done-callback as soon as
+        # its keywords arrive, without waiting for the other categories
+        category_futures = {
+            category: then(
+                executor.submit(
+                    fetch_keywords_data,
+                    period=period,
+                    category=category,
+                    limit=limit,
+                    sort=sort
+                ),
+                submit_category
+            )
+            for category in categories
+        }
+
+        for category in categories:
+            yield category, None, None
+
+            keyword_jobs = category_futures[category].result()
+            if not isinstance(keyword_jobs, tuple):
+                yield category, None, keyword_jobs
+                continue
+
+            try:
+                items, summary_futures, sources_futures = keyword_jobs
+                summaries = {}
+                for summary_future in summary_futures:
+                    summaries.update(summary_future.result())
+            except Exception as e:
+                yield category, None, {"Error": f"Failed to process keywords: {str(e)}"}
+                continue
+
+            for item, sources_future in zip(items, sources_futures):
+                keyword = item.get("keyword")
+                try:
+                    data = build_keyword_result(
+                        keyword_stats(item),
+                        summaries[keyword],
+                        sources_future.result()
+                    )
+                except Exception as e:
+                    yield category, None, {"Error": f"Failed to process keywords: {str(e)}"}
+                    break
+                yield category, keyword, data
+
+def collect_keywords_sources_data(events):
+    """Build the all_results mapping from (category, keyword, data) events."""
+    all_results = {}
+    for event in events:
+        collect_result_event(all_results, event)
+    return all_results
+
+def collect_result_event(all_results, event):
+    category, keyword, data = event
+    if keyword is not None:
+        all_results[category][keyword] = data
+    else:
+        all_results[category] = {} if data is None else data
+
+def iter_keywords_sources_report(sort, categories=None, period="daily", limit=None, max_workers=None, batch_size=None):
+    """Yield the markdown report section by section as the data arrives."""
+    report_title, category_suffix = report_labels(sort)
+    events = iter_keywords_sources_data(
+        sort,
+        categories=categories,
+        period=period,
+        limit=limit,
+        max_workers=max_workers,
+        batch_size=batch_size
+    )
+    yield from stream_enhanced_report(events, report_title, category_suffix)
+
+def report_stream_writer(tool_name):
+    """Return a callable that forwards report chunks to LangGraph "custom" stream consumers.
+
+    Outside a graph run the returned callable does nothing.
+    """
+    try:
+        writer = get_stream_writer()
+    except (RuntimeError, KeyError):
+        return lambda chunk: None
+    return lambda chunk: writer({"tool": tool_name, "report_chunk": chunk})
+
+def stream_keywords_report(tool_name, sort, categories=None, period="daily", limit=None):
+    """iter_keywords_sources_report, also forwarding each chunk to the tool's "custom" stream consumers."""
+    write_chunk = report_stream_writer(tool_name)
+    for chunk in iter_keywords_sources_report(sort, categories=categories, period=period, limit=limit):
+        write_chunk(chunk)
+        yield chunk
+
+def default_categories(sort):
+    return ['companies', 'subjects', 'people', 'websites'] if sort == "trending" else ['companies', 'subjects']
+
+def report_labels(sort):
+    """Report title and category suffix for a sort order."""
     report_title = "Trending Keywords Analysis" if sort == "trending" else "Top Keywords Analysis"
     category_suffix = "TRENDS" if sort == "trending" else "MOST MENTIONED"
-    
-    return all_results, report_title, category_suffix
+    return report_title, category_suffix
+
+def keyword_stats(item):
+    return {
+        "count": item.get("count"),
+        "change_in_count": item.get("change_in_count"),
+        "engagement": item.get("engagement"),
+        "sentiment": item.get("sentiment")
+    }
+
+def submit_keyword_fetches(executor, items, period, batch_size=None):
+    """Submit the batched summary lookups and per-keyword sources lookups for a category."""
+    keywords = list(dict.fromkeys(item.get("keyword") for item in items))
+    summary_futures = [
+        submit_keyword_summaries(executor, batch, period=period)
+        for batch in summary_batches(keywords, batch_size)
+    ]
+    sources_futures = [
+        executor.submit(fetch_sources_data, keyword=item.get("keyword"), period=period, limit=3)
+        for item in items
+    ]
+    return items, summary_futures, sources_futures
+
+def build_keyword_result(stats, summary_response, sources_response):
+    """Combine the stats, summary and sources responses for a keyword."""
+    summary_success, summary_data = summary_response
+    summary = summary_data.get("summary") if summary_success else "Summary not available"
+
+    sources_success, sources_data = sources_response
+    sources = []
+    if sources_success:
+        try:
+            for source in sources_data.get("articles", []):
+                sources.append({
+                    "text": source.get("text"),
+                    "engagement": source.get("engagement"),
+                    "url": source.get("link"),
+                    "source": source.get("source"),
+                    "type": source.get("type")
+                })
+        except Exception as e:
+            print(f"Error parsing sources: {e}")
+            sources = [f"Error parsing sources: {str(e)}"]
+    else:
+        sources = [sources_data]
+    
+    return {
+        "stats": stats,
+        "summary": summary,
+        "sources": sources
+    }
 
 # -------------------- TOOLS --------------------
 
@@ -312,14 +595,7 @@ def trending_keywords_sources_tool(categories: Optional[List[str]] = None, perio
         Complete report with trending keywords, statistics, summaries and sources.
     """
 
-    results, title, suffix = get_keywords_sources_data(
-        sort="trending",
-        categories=categories,
-        period=period,
-        limit=limit
-    )
-    
-    return format_enhanced_report(results, title, suffix)
+    return "".join(stream_keywords_report("trending_keywords_sources_tool", "trending", categories=categories, period=period, limit=limit))
 
 @tool
 def top_keywords_sources_tool(categories: Optional[List[str]] = None, period: str = "daily", limit: int = 2) -> str:
@@ -338,14 +614,7 @@ def top_keywords_sources_tool(categories: Optional[List[str]] = None, period: st
         Complete report with top keywords, statistics, summaries and sources.
     """
 
-    results, title, suffix = get_keywords_sources_data(
-        sort="top",
-        categories=categories,
-        period=period,
-        limit=limit
-    )
-    
-    return format_enhanced_report(results, title, suffix)
+    return "".join(stream_keywords_report("top_keywords_sources_tool", "top", categories=categories, period=period, limit=limit))
 
 
 @tool
@@ -398,39 +667,40 @@ def keyword_source_search_tool(
         
     return response
 
-CURRENT_NOTES_FILE = None
-
-def get_or_create_notes_file():
-    """Get the current notes file path or create a new one."""
-    global CURRENT_NOTES_FILE
-    if CURRENT_NOTES_FILE is None:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        unique_id = str(uuid.uuid4())[:8]
-        filename = f"research_notes_{timestamp}_{unique_id}.md"
-        
-        os.makedirs("notes", exist_ok=True)
-        CURRENT_NOTES_FILE = os.path.join("notes", filename)
-        
-        with open(CURRENT_NOTES_FILE, "w") as f:
-            f.write(f"# Research Notes - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-        
-        print(f"\n----- CREATED NEW NOTES FILE: {CURRENT_NOTES_FILE} -----\n")
-    
-    return CURRENT_NOTES_FILE
+def get_notes_store(session_id=None):
+    """Get the notes store for the current run (keyed by LangGraph thread_id) or create a new one."""
+    return get_session_store(session_id)
 
 @tool
-def read_notes() -> str:
+def read_notes(
+    sections: Optional[List[str]] = None,
+    max_tokens: Optional[int] = None,
+    digest: bool = False,
+    sources_per_keyword: Optional[int] = None
+) -> str:
     """Read the current research notes file.
     
+    Args:
+        sections: Only return these sections (e.g. ["Trending Keywords Analysis"]); all sections by default
+        max_tokens: Approximate token budget for the result; long sections are truncated to fit
+        digest: Keep only the first few sources under each keyword to get a shorter overview
+        sources_per_keyword: Sources kept per keyword in digest mode (default 3)
+        
     Returns:
         The current contents of the research notes file.
     """
-    notes_file = get_or_create_notes_file()
-    
     try:
-        with open(notes_file, "r") as f:
-            content = f.read()
-        return content
+        store = get_notes_store()
+        notes = read_document(
+            store, sections=sections, max_tokens=max_tokens,
+            digest=digest, sources_per_keyword=sources_per_keyword
+        )
+        if sections:
+            available = store.sections()
+            missing = [section for section in sections if section not in available]
+            if missing:
+                notes += f"\n\n(Sections not found: {', '.join(missing)}. Available sections: {', '.join(available)})"
+        return notes
     except Exception as e:
         return f"Error reading notes file: {str(e)}"
 
@@ -445,39 +715,240 @@ def write_notes(content: str, section: str = "General") -> str:
     Returns:
         Confirmation message.
     """
-    notes_file = get_or_create_notes_file()
-    
     try:
-        existing_content = ""
-        try:
-            with open(notes_file, "r") as f:
-                existing_content = f.read()
-        except FileNotFoundError:
-            pass
-        
-        section_header = f"## {section}"
-        if section_header in existing_content:
-            lines = existing_content.split("\n")
-            with open(notes_file, "w") as f:
-                section_found = False
-                for line in lines:
-                    f.write(line + "\n")
-                    if line == section_header:
-                        section_found = True
-                        f.write(f"\n{content}\n\n")
-                
-                if not section_found:
-                    f.write(f"\n## {section}\n\n{content}\n\n")
-        else:
-            with open(notes_file, "a") as f:
-                f.write(f"\n## {section}\n\n{content}\n\n")
-        
-        with open(notes_file, "r") as f:
-            current_content = f.read()
-        print(f"\n----- NOTES FILE CONTENTS AFTER WRITING TO SECTION '{section}' -----\n")
-        print(current_content)
-        print(f"\n----- END OF NOTES FILE CONTENTS -----\n")
-        
-        return f"Successfully added to research notes under section '{section}'."
+        store = get_notes_store()
+        store.append(section, f"{content}\n\n")
+        return notes_written(store, section)
     except Exception as e:
         return f"Error writing to notes file: {str(e)}"
+
+def stream_notes(chunks, section="General"):
+    """Write content to a notes section chunk by chunk as it is produced.
+
+    Ends up with the same section as write_notes with the joined chunks. Errors from
+    producing or storing a chunk propagate, leaving the chunks written so far.
+    """
+    store = get_notes_store()
+    for chunk in chunks:
+        store.append(section, chunk)
+    store.append(section, "\n\n")
+    return notes_written(store, section)
+
+def notes_written(store, section):
+    if ECHO_NOTES:
+        print(f"\n----- NOTES FILE CONTENTS AFTER WRITING TO SECTION '{section}' -----\n")
+        print(store.render())
+        print(f"\n----- END OF NOTES FILE CONTENTS -----\n")
+
+    return f"Successfully added to research notes under section '{section}'."
+
+# -------------------- ASYNC --------------------
+# Async counterparts of the API functions and tools. HTTP calls run on a dedicated
+# worker pool so they keep using the pooled session, response cache and request coalescing.
+
+ASYNC_API_WORKERS = int(os.environ.get("SAFRON_ASYNC_WORKERS", "32"))
+_api_executor = ThreadPoolExecutor(max_workers=ASYNC_API_WORKERS, thread_name_prefix="safron-api")
+
+async def run_in_api_executor(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_api_executor, functools.partial(func, *args, **kwargs))
+
+async def afetch_keywords_data(*args, **kwargs):
+    return await run_in_api_executor(fetch_keywords_data, *args, **kwargs)
+
+async def afetch_sources_data(*args, **kwargs):
+    return await run_in_api_executor(fetch_sources_data, *args, **kwargs)
+
+async def afetch_keyword_summary(*args, **kwargs):
+    return await run_in_api_executor(fetch_keyword_summary, *args, **kwargs)
+
+async def afetch_batch_summaries(*args, **kwargs):
+    return await run_in_api_executor(fetch_batch_summaries, *args, **kwargs)
+
+async def aget_keywords_sources_data(sort, categories=None, period="daily", limit=None, max_workers=None, batch_size=None):
+    """Async version of get_keywords_sources_data."""
+    all_results = {}
+    async for event in aiter_keywords_sources_data(
+        sort,
+        categories=categories,
+        period=period,
+        limit=limit,
+        max_workers=max_workers,
+        batch_size=batch_size
+    ):
+        collect_result_event(all_results, event)
+    report_title, category_suffix = report_labels(sort)
+
+    return all_results, report_title, category_suffix
+
+async def aiter_keywords_sources_data(sort, categories=None, period="daily", limit=None, max_workers=None, batch_size=None):
+    """Async version of iter_keywords_sources_data, bounded by a semaphore instead of a thread pool."""
+    if not categories:
+        categories = default_categories(sort)
+
+    if limit is None:
+        limit = 3 if sort == "trending" else 2
+
+    if max_workers is None:
+        max_workers = MAX_WORKERS
+
+    semaphore = asyncio.Semaphore(max(1, max_workers))
+    tasks = []
+
+    def spawn(fetch, **kwargs):
+        async def bounded():
+            async with semaphore:
+                return await fetch(**kwargs)
+        task = asyncio.ensure_future(bounded())
+        tasks.append(task)
+        return task
+
+    async def fetch_summaries(keywords):
+        summaries = await spawn(afetch_batch_summaries, keywords=keywords, period=period)
+        missing = [keyword for keyword in keywords if keyword not in summaries]
+        responses = await asyncio.gather(*(
+            spawn(afetch_keyword_summary, keyword=keyword, period=period) for keyword in missing
+        ))
+        return {**summaries, **dict(zip(missing, responses))}
+
+    async def fetch_category(category):
+        success, keywords_data = await spawn(
+            afetch_keywords_data,
+            period=period,
+            category=category,
+            limit=limit,
+            sort=sort
+        )
+
+        if not success:
+            return keywords_data  # Error message
+
+        try:
+            items = [item for item in keywords_data.get("keywords", []) if item.get("keyword")]
+            keywords = list(dict.fromkeys(item.get("keyword") for item in items))
+            summary_tasks = [
+                asyncio.ensure_future(fetch_summaries(batch))
+                for batch in summary_batches(keywords, batch_size)
+            ]
+            tasks.extend(summary_tasks)
+            sources_tasks = [
+                spawn(afetch_sources_data, keyword=item.get("keyword"), period=period, limit=3)
+                for item in items
+            ]
+            return items, summary_tasks, sources_tasks
+        except Exception as e:
+            return {"Error": f"Failed to process keywords: {str(e)}"}
+
+    category_tasks = [asyncio.ensure_future(fetch_category(category)) for category in categories]
+    tasks.extend(category_tasks)
+
+    try:
+        for category, category_task in zip(categories, category_tasks):
+            yield category, None, None
+
+            keyword_jobs = await category_task
+            if not isinstance(keyword_jobs, tuple):
+                yield category, None, keyword_jobs
+                continue
+
+            try:
+                items, summary_tasks, sources_tasks = keyword_jobs
+                summaries = {}
+                for summary_task in summary_tasks:
+                    summaries.update(await summary_task)
+            except Exception as e:
+                yield category, None, {"Error": f"Failed to process keywords: {str(e)}"}
+                continue
+
+            for item, sources_task in zip(items, sources_tasks):
+                keyword = item.get("keyword")
+                try:
+                    data = build_keyword_result(keyword_stats(item), summaries[keyword], await sources_task)
+                except Exception as e:
+                    yield category, None, {"Error": f"Failed to process keywords: {str(e)}"}
+                    break
+                yield category, keyword, data
+    finally:
+        for task in tasks:
+            task.cancel()
+
+async def aiter_keywords_sources_report(sort, categories=None, period="daily", limit=None, max_workers=None, batch_size=None):
+    """Async version of iter_keywords_sources_report."""
+    report_title, category_suffix = report_labels(sort)
+    yield format_report_title(report_title)
+
+    events = aiter_keywords_sources_data(
+        sort,
+        categories=categories,
+        period=period,
+        limit=limit,
+        max_workers=max_workers,
+        batch_size=batch_size
+    )
+    async for event in events:
+        for chunk in format_report_event(event, category_suffix):
+            yield chunk
+
+async def astream_keywords_report(tool_name, sort, categories=None, period="daily", limit=None):
+    """Async version of stream_keywords_report."""
+    write_chunk = report_stream_writer(tool_name)
+    async for chunk in aiter_keywords_sources_report(sort, categories=categories, period=period, limit=limit):
+        write_chunk(chunk)
+        yield chunk
+
+@tool("trending_keywords_sources_tool", description=trending_keywords_sources_tool.description)
+async def atrending_keywords_sources_tool(categories: Optional[List[str]] = None, period: str = "daily", limit: int = 3) -> str:
+    chunks = []
+    async for chunk in astream_keywords_report("trending_keywords_sources_tool", "trending", categories=categories, period=period, limit=limit):
+        chunks.append(chunk)
+
+    return "".join(chunks)
+
+@tool("top_keywords_sources_tool", description=top_keywords_sources_tool.description)
+async def atop_keywords_sources_tool(categories: Optional[List[str]] = None, period: str = "daily", limit: int = 2) -> str:
+    chunks = []
+    async for chunk in astream_keywords_report("top_keywords_sources_tool", "top", categories=categories, period=period, limit=limit):
+        chunks.append(chunk)
+
+    return "".join(chunks)
+
+@tool("keyword_source_search_tool", description=keyword_source_search_tool.description)
+async def akeyword_source_search_tool(
+    keywords: str,
+    source: str = None,
+    period: str = "daily",
+    limit: int = 10,
+    content_type: str = None
+) -> str:
+    return await run_in_api_executor(
+        keyword_source_search_tool.func,
+        keywords=keywords,
+        source=source,
+        period=period,
+        limit=limit,
+        content_type=content_type
+    )
+
+@tool("read_notes", description=read_notes.description)
+async def aread_notes(
+    sections: Optional[List[str]] = None,
+    max_tokens: Optional[int] = None,
+    digest: bool = False,
+    sources_per_keyword: Optional[int] = None
+) -> str:
+    return await asyncio.to_thread(
+        read_notes.func, sections=sections, max_tokens=max_tokens,
+        digest=digest, sources_per_keyword=sources_per_keyword
+    )
+
+@tool("write_notes", description=write_notes.description)
+async def awrite_notes(content: str, section: str = "General") -> str:
+    return await asyncio.to_thread(write_notes.func, content=content, section=section)
+
+async def astream_notes(chunks, section="General"):
+    """Async stream_notes: chunks is an async iterator; each append runs in a worker thread."""
+    store = get_notes_store()
+    async for chunk in chunks:
+        await asyncio.to_thread(store.append, section, chunk)
+    await asyncio.to_thread(store.append, section, "\n\n")
+    return await asyncio.to_thread(notes_written, store, section)
@@ -0,0 +1,42 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from my_agent.utils import context
+from my_agent.utils.nodes import normalize_history, prepare_supervisor_context
+
+
+def run(index, turns):
+    request = HumanMessage(content=f"run {index} request " + "x" * 400, id=f"request-{index}")
+    replies = [AIMessage(content=f"run {index} turn {turn}", name="worker", id=f"run-{index}-{turn}") for turn in range(turns)]
+    return [request, *replies]
+
+
+def window(state):
+    messages, update = prepare_supervisor_context("system", state)
+    return messages, {**state, "context_summary": update.get("context_summary")}
+
+
+def test_second_run_on_a_thread_keeps_its_own_request(monkeypatch):
+    monkeypatch.setattr(context, "CONTEXT_RECENT_TURNS", 6)
+    monkeypatch.setattr(context, "CONTEXT_MAX_TOKENS", 0)
+
+    state = {"messages": run(1, 10)}
+    messages, state = window(state)
+    assert messages[1].id == "request-1"
+
+    state["messages"] = state["messages"] + run(2, 8)
+    messages, state = window(state)
+    assert messages[1].id == "request-2"
+    assert messages[1].content == state["messages"][11].content
+    assert [message.id for message in messages[2:]] == [f"run-2-{turn}" for turn in range(2, 8)]
+
+    outline = messages[0].content
+    assert "run 2 turn 1" in outline and "run 1" not in outline
+    assert state["context_summary"] == {"run": "request-2", "count": 2, "lines": outline.splitlines()[-2:]}
+
+
+def test_normalized_cache_follows_the_message_content():
+    first = normalize_history([HumanMessage(content=[{"type": "text", "text": "first"}], id="reused")])
+    again = normalize_history([HumanMessage(content=[{"type": "text", "text": "first"}], id="reused")])
+    edited = normalize_history([HumanMessage(content="second ", id="reused")])
+    assert again[0] is first[0]
+    assert [first[0].content, edited[0].content] == ["first", "second"]
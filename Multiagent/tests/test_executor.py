@@ -0,0 +1,71 @@
+from my_agent.utils.executor import parse_tool_args, run_direct_node, tool_arguments
+from my_agent.utils.notes import MemoryNotesStore
+
+FIELDS = {"categories": {}, "period": {}, "source": {}, "keywords": {}}
+
+
+def test_apostrophes_are_not_quotes():
+    assert parse_tool_args("I'm a developer who wants to track 'Rust'", FIELDS) == {}
+    assert parse_tool_args('I\'m tracking "Rust" and “Zig”', FIELDS) == {"keywords": "Rust, Zig"}
+
+
+def test_prose_is_not_parsed_as_arguments():
+    assert parse_tool_args("What are people saying about AI tools this weekly digest?", FIELDS) == {}
+
+
+def test_explicit_forms_are_parsed():
+    args = parse_tool_args("categories: [AI, Frameworks, unknown], period: monthly and source: github", FIELDS)
+    assert args == {"categories": ["ai", "frameworks"], "period": "monthly", "source": "github"}
+
+
+class Tool:
+    name = "trending_keywords_sources_tool"
+    description = "Trending keywords and their sources."
+    args = FIELDS
+
+
+class Extractor:
+    def __init__(self, values):
+        self.values = values
+
+    def invoke(self, messages):
+        return self.values
+
+
+def test_extractor_values_win_over_parsed_ones():
+    spec = {"tool": Tool(), "required": ("categories", "period"), "defaults": {}, "fixed": {}}
+    extractor = Extractor({"categories": ["tools"], "period": "daily", "keywords": None})
+    args = tool_arguments(spec, "request", "period: weekly", extractor)
+    assert args == {"categories": ["tools"], "period": "daily"}
+
+
+class RecordingStore(MemoryNotesStore):
+    def __init__(self):
+        super().__init__()
+        self.appends = 0
+
+    def _append(self, section, content):
+        self.appends += 1
+        super()._append(section, content)
+
+
+def test_direct_node_streams_the_report_into_the_notes(monkeypatch):
+    from my_agent.utils import tools
+    from my_agent.utils.nodes import DIRECT_TOOLS
+
+    monkeypatch.setattr(tools, "fetch_keywords_data", lambda period="daily", category=None, limit=3, sort="trending": (
+        True, {"keywords": [{"keyword": f"{category}-{index}", "count": index, "change_in_count": 1} for index in range(limit)]}
+    ))
+    monkeypatch.setattr(tools, "fetch_batch_summaries", lambda keywords, period="daily": {})
+    monkeypatch.setattr(tools, "fetch_keyword_summary", lambda keyword, period="daily": (True, {"summary": keyword}))
+    monkeypatch.setattr(tools, "fetch_sources_data", lambda keyword, period="daily", limit=3: (True, {"articles": []}))
+    store = RecordingStore()
+    monkeypatch.setattr(tools, "get_notes_store", lambda session_id=None: store)
+
+    spec = DIRECT_TOOLS["top_keywords_agent"]
+    command = run_direct_node(spec, "request", "categories: companies, subjects; period: weekly", "top_keywords_agent", "top_keywords_agent", "research_supervisor")
+
+    report = spec["tool"].invoke({"categories": ["companies", "subjects"], "period": "weekly"})
+    assert store.read_sections() == {"Top Keywords Analysis": f"{report}\n\n"}
+    assert store.appends > 2
+    assert command.goto == "research_supervisor"
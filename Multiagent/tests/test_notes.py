@@ -0,0 +1,37 @@
+from my_agent.utils import notes
+from my_agent.utils.notes import create_store, digest_section, run_session_id, session_notes_path
+
+
+def source_items(count):
+    return "".join(f"{i}. **Article {i}**\n   - Source: reddit\n\n" for i in range(1, count + 1))
+
+
+def test_digest_keeps_sources_for_every_search_keyword():
+    content = "# Keyword Search Results\n\n" + "".join(
+        f"## Sources for '{keyword}'\n\n{source_items(5)}---\n\n" for keyword in ("rust", "go")
+    )
+    digest = digest_section(content, sources_per_keyword=2)
+    for block in digest.split("## Sources for ")[1:]:
+        assert "1. **Article 1**" in block and "2. **Article 2**" in block
+        assert "3. **Article 3**" not in block
+        assert block.count("_(3 more sources omitted)_") == 1
+
+
+def test_digest_restarts_the_count_under_each_keyword_heading():
+    content = "## AI - TRENDS\n\n" + "".join(f"### {keyword}\n\n{source_items(3)}" for keyword in ("llm", "agents"))
+    digest = digest_section(content, sources_per_keyword=1)
+    assert digest.count("1. **Article 1**") == 2
+    assert digest.count("_(2 more sources omitted)_") == 2
+
+
+def test_runs_with_similar_request_ids_get_separate_documents():
+    first, second = run_session_id("message-1"), run_session_id("message-2")
+    assert first != second
+    assert session_notes_path(first) != session_notes_path(second)
+
+
+def test_notes_title_is_only_fixed_when_responses_are_cached(monkeypatch):
+    monkeypatch.setattr(notes, "get_llm_cache", lambda: None)
+    assert create_store("session", backend="memory").title.startswith("Research Notes - ")
+    monkeypatch.setattr(notes, "get_llm_cache", lambda: object())
+    assert create_store("session", backend="memory").title == "Research Notes"
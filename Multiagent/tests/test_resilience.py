@@ -0,0 +1,69 @@
+import pytest
+
+from my_agent.utils import resilience
+from my_agent.utils.resilience import CircuitBreaker, CircuitOpenError, call_with_resilience, endpoint_state
+
+
+class Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.headers = {}
+
+
+@pytest.fixture
+def endpoint(monkeypatch):
+    """An endpoint whose breaker opens after one failed request and cools down instantly."""
+    monkeypatch.setattr(resilience.time, "sleep", lambda seconds: None)
+    resilience.reset_resilience()
+    state = endpoint_state("test")
+    state["breaker"] = CircuitBreaker(failure_threshold=1, cooldown=0)
+    state["policy"] = {"max_attempts": 3, "base_delay": 0.0, "max_delay": 0.0}
+    yield "test"
+    resilience.reset_resilience()
+
+
+def responses(*status_codes):
+    codes = iter(status_codes)
+    return lambda: Response(next(codes))
+
+
+def test_failed_half_open_trial_reopens_the_breaker(endpoint):
+    breaker = endpoint_state(endpoint)["breaker"]
+    assert call_with_resilience(endpoint, responses(503, 503, 503)).status_code == 503
+    assert breaker.state == "open"
+
+    # The trial retries instead of short-circuiting itself, and its failure is recorded
+    assert call_with_resilience(endpoint, responses(503, 503, 503)).status_code == 503
+    assert breaker.state == "open"
+
+    # After the cool-down a healthy trial closes the breaker again
+    assert call_with_resilience(endpoint, responses(200)).status_code == 200
+    assert breaker.state == "closed"
+    assert call_with_resilience(endpoint, responses(200)).status_code == 200
+
+
+def test_half_open_trial_recovers_within_its_retries(endpoint):
+    breaker = endpoint_state(endpoint)["breaker"]
+    call_with_resilience(endpoint, responses(503, 503, 503))
+    assert call_with_resilience(endpoint, responses(503, 200)).status_code == 200
+    assert breaker.state == "closed"
+
+
+def test_raising_trial_releases_the_breaker(endpoint):
+    breaker = endpoint_state(endpoint)["breaker"]
+    breaker.cooldown = 60
+
+    def fail():
+        raise ConnectionError("down")
+
+    with pytest.raises(ConnectionError):
+        call_with_resilience(endpoint, fail)
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        call_with_resilience(endpoint, responses(200))
+
+    breaker.cooldown = 0
+    with pytest.raises(ConnectionError):
+        call_with_resilience(endpoint, fail)
+    assert call_with_resilience(endpoint, responses(200)).status_code == 200
+    assert breaker.state == "closed"
@@ -0,0 +1,28 @@
+import threading
+
+from my_agent.utils import tools
+
+
+def test_ready_category_is_not_held_back_by_a_slower_one(monkeypatch):
+    release = threading.Event()
+    returned = []
+
+    def fetch_keywords_data(period="daily", category=None, limit=3, sort="trending"):
+        if category == "subjects":
+            release.wait(5)
+        returned.append(category)
+        return True, {"keywords": [{"keyword": f"{category}-kw", "count": 1}]}
+
+    monkeypatch.setattr(tools, "fetch_keywords_data", fetch_keywords_data)
+    monkeypatch.setattr(tools, "fetch_batch_summaries", lambda keywords, period="daily": {})
+    monkeypatch.setattr(tools, "fetch_keyword_summary", lambda keyword, period="daily": (True, {"summary": keyword}))
+    monkeypatch.setattr(tools, "fetch_sources_data", lambda keyword, period="daily", limit=3: (True, {"articles": []}))
+
+    events = tools.iter_keywords_sources_data("top", categories=["companies", "subjects"], max_workers=4)
+    assert next(events) == ("companies", None, None)
+    category, keyword, data = next(events)
+    assert (category, keyword, data["summary"]) == ("companies", "companies-kw", "companies-kw")
+    assert returned == ["companies"]
+
+    release.set()
+    assert [event[:2] for event in events] == [("subjects", None), ("subjects", "subjects-kw")]